@@ -0,0 +1,88 @@
+"""Fixtures for the client benchmarks.
+
+Run with ``pytest benchmarks --benchmark-only``. The benchmarks need Home
+Assistant (the client lives in the integration package) and pytest-benchmark,
+and are skipped when either is missing. The correctness tests in
+``test_client.py`` only need Home Assistant and run with ``pytest benchmarks``.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mock_server import MockAccount, MockTickTickServer  # noqa: E402
+
+ACCOUNT_SIZES = [1_000, 10_000, 100_000]
+
+
+def mock_client_class(base_url: str, client_class=None):
+    """Return a subclass of ``client_class`` (TickTickClient) talking to the mock server."""
+    from custom_components.ticktick import TickTickClient
+
+    class MockTickTickClient(client_class or TickTickClient):
+        BASE_URL = base_url + "/api/v2/"
+        OPEN_API_BASE_URL = base_url
+        BATCH_CHECK_URL = BASE_URL + "batch/check/"
+        INITIAL_BATCH_URL = BATCH_CHECK_URL + "0"
+
+    return MockTickTickClient
+
+
+@pytest.fixture(scope="module", params=ACCOUNT_SIZES, ids=lambda size: f"{size}_tasks")
+def mock_server(request):
+    """A mock TickTick server for each account size."""
+    account = MockAccount(num_tasks=request.param, num_projects=max(20, request.param // 500))
+    with MockTickTickServer(account) as server:
+        yield server
+
+
+def mock_oauth(**kwargs):
+    """Return the OAuth2 manager of a mock client."""
+    from custom_components.ticktick import OAuth2
+
+    return OAuth2(
+        client_id="client",
+        client_secret="secret",
+        redirect_uri="http://127.0.0.1:8080",
+        access_token=json.dumps({"access_token": "mock-access-token"}),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def make_client(mock_server):
+    """Build clients that are logged in and synced against the mock server."""
+
+    def _make_client(**kwargs):
+        client_class = mock_client_class(mock_server.url)
+        return client_class("user@example.com", "password", mock_oauth(), **kwargs)
+
+    return _make_client
+
+
+@pytest.fixture
+def make_async_client(mock_server):
+    """Build async clients on an aiohttp session, synced unless ``prepare`` is false."""
+    from custom_components.ticktick import AsyncTickTickClient
+
+    async def _make_async_client(session, prepare: bool = True, **kwargs):
+        client_class = mock_client_class(mock_server.url, AsyncTickTickClient)
+        client = client_class(mock_oauth(session=session), session, **kwargs)
+        if prepare:
+            await client.prepare_session()
+        return client
+
+    return _make_async_client
+
+
+@pytest.fixture
+def client(make_client):
+    """A client synced with the mock account."""
+    return make_client(sync_on_write=False)
@@ -0,0 +1,506 @@
+"""Local stand-in for the TickTick API used by the benchmark suite.
+
+The server implements the endpoints the client talks to and serves a
+synthetic account of configurable size. It only depends on the standard
+library, so it can also be run by hand:
+
+    python benchmarks/mock_server.py --tasks 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import random
+import re
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/api/v2/"
+TICKTICK_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+QUERY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _object_id() -> str:
+    return secrets.token_hex(12)
+
+
+def _etag() -> str:
+    return secrets.token_hex(4)
+
+
+class MockApiError(Exception):
+    """An error answered with ``status`` instead of a response body."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class MockAccount:
+    """A synthetic TickTick account held in memory."""
+
+    def __init__(
+        self,
+        num_tasks: int = 1000,
+        num_projects: int = 20,
+        num_tags: int = 50,
+        num_completed: int = 500,
+        subtask_ratio: float = 0.1,
+        seed: int = 0,
+    ) -> None:
+        """Generate the account deterministically from ``seed``."""
+        rng = random.Random(seed)
+        self.lock = threading.RLock()
+        self.inbox_id = "inbox" + "0" * 19
+        self.checkpoint = 1
+        # Task id -> checkpoint of its last change, used to answer delta syncs
+        self.changed: dict[str, int] = {}
+        self.deleted: dict[str, tuple[str, int]] = {}
+        # Tasks completed or abandoned, delta syncs send them with their new status
+        self.closed: dict[str, tuple[dict, int]] = {}
+        # Delta syncs from older checkpoints are rejected
+        self.oldest_checkpoint = 0
+        self._snapshot: bytes | None = None
+        self.project_folders = [
+            {"id": _object_id(), "name": f"Folder {i}", "etag": _etag(), "listType": "group"}
+            for i in range(max(1, num_projects // 10))
+        ]
+        self.projects = {}
+        for i in range(num_projects):
+            project_id = _object_id()
+            self.projects[project_id] = {
+                "id": project_id,
+                "name": f"Project {i}",
+                "etag": _etag(),
+                "color": "#%06x" % rng.randrange(0x1000000),
+                "kind": "TASK",
+                "groupId": rng.choice(self.project_folders)["id"],
+                "closed": False,
+            }
+        self.tags = {}
+        for i in range(num_tags):
+            name = f"tag{i}"
+            self.tags[name] = {
+                "name": name,
+                "label": f"Tag{i}",
+                "etag": _etag(),
+                "color": "#%06x" % rng.randrange(0x1000000),
+                "sortType": "project",
+                "parent": "",
+            }
+        project_ids = [*self.projects, self.inbox_id]
+        tag_names = list(self.tags)
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self.tasks = {}
+        for i in range(num_tasks):
+            task_id = _object_id()
+            due = start + datetime.timedelta(hours=rng.randrange(24 * 365))
+            task = {
+                "id": task_id,
+                "projectId": rng.choice(project_ids),
+                "title": f"Task {i}",
+                "content": f"Content of task {i}" if rng.random() < 0.5 else "",
+                "status": 0,
+                "priority": rng.choice((0, 1, 3, 5)),
+                "etag": _etag(),
+                "startDate": due.strftime(TICKTICK_TIME_FORMAT),
+                "dueDate": due.strftime(TICKTICK_TIME_FORMAT),
+                "allDay": rng.random() < 0.3,
+                "timeZone": "UTC",
+                "tags": rng.sample(tag_names, k=min(len(tag_names), rng.randrange(3))),
+                "sortOrder": -i * 1024,
+                "items": [],
+                "reminders": [],
+                "modifiedTime": due.strftime(TICKTICK_TIME_FORMAT),
+                "kind": "TEXT",
+            }
+            self.tasks[task_id] = task
+        task_ids = list(self.tasks)
+        for task_id in rng.sample(task_ids, k=int(len(task_ids) * subtask_ratio)):
+            parent = self.tasks[rng.choice(task_ids)]
+            if parent["id"] != task_id and "parentId" not in parent:
+                self.tasks[task_id]["parentId"] = parent["id"]
+                self.tasks[task_id]["projectId"] = parent["projectId"]
+        self.completed = []
+        for i in range(num_completed):
+            completed_time = start + datetime.timedelta(minutes=rng.randrange(60 * 24 * 365))
+            self.completed.append(
+                {
+                    "id": _object_id(),
+                    "projectId": rng.choice(project_ids),
+                    "title": f"Completed task {i}",
+                    "status": 2,
+                    "etag": _etag(),
+                    "completedTime": completed_time.strftime(TICKTICK_TIME_FORMAT),
+                }
+            )
+        self.completed.sort(key=lambda task: task["completedTime"], reverse=True)
+
+    def _touch(self, task_id: str) -> None:
+        self.checkpoint += 1
+        self.changed[task_id] = self.checkpoint
+        self.deleted.pop(task_id, None)
+        self._snapshot = None
+
+    def _drop(self, task_id: str) -> dict | None:
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            self.checkpoint += 1
+            self.changed.pop(task_id, None)
+            self.deleted[task_id] = (task["projectId"], self.checkpoint)
+            self._snapshot = None
+        return task
+
+    def close_task(self, task_id: str, status: int = 2) -> dict | None:
+        """Complete (2) or abandon (-1) a task, as another TickTick client would."""
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            self.checkpoint += 1
+            self.changed.pop(task_id, None)
+            task = {**task, "status": status, "etag": _etag()}
+            if status == 2:
+                now = datetime.datetime.now(datetime.timezone.utc)
+                task["completedTime"] = now.strftime(TICKTICK_TIME_FORMAT)
+                self.completed.insert(0, task)
+            self.closed[task_id] = (task, self.checkpoint)
+            self._snapshot = None
+        return task
+
+    def expire_checkpoints(self) -> None:
+        """Reject delta syncs from every checkpoint handed out so far."""
+        self.oldest_checkpoint = self.checkpoint + 1
+
+    def _lists_changed(self) -> None:
+        self.checkpoint += 1
+        self._snapshot = None
+
+    def batch_check(self, checkpoint: int) -> bytes:
+        """Return the body of ``batch/check/<checkpoint>``."""
+        if checkpoint == 0:
+            if self._snapshot is None:
+                self._snapshot = json.dumps(
+                    {
+                        "checkPoint": self.checkpoint,
+                        "inboxId": self.inbox_id,
+                        "projectGroups": self.project_folders,
+                        "projectProfiles": list(self.projects.values()),
+                        "tags": list(self.tags.values()),
+                        "syncTaskBean": {
+                            "update": list(self.tasks.values()),
+                            "delete": [],
+                            "add": [],
+                            "empty": not self.tasks,
+                        },
+                    }
+                ).encode()
+            return self._snapshot
+        if checkpoint < self.oldest_checkpoint:
+            raise MockApiError(400, f"Checkpoint {checkpoint} expired")
+        updated = [
+            self.tasks[task_id]
+            for task_id, changed in self.changed.items()
+            if changed > checkpoint and task_id in self.tasks
+        ] + [task for task, changed in self.closed.values() if changed > checkpoint]
+        deleted = [
+            {"taskId": task_id, "projectId": project_id}
+            for task_id, (project_id, changed) in self.deleted.items()
+            if changed > checkpoint
+        ]
+        return json.dumps(
+            {
+                "checkPoint": self.checkpoint,
+                "inboxId": self.inbox_id,
+                "projectGroups": None,
+                "projectProfiles": list(self.projects.values()),
+                "tags": list(self.tags.values()),
+                "syncTaskBean": {
+                    "update": updated,
+                    "delete": deleted,
+                    "add": [],
+                    "empty": not updated and not deleted,
+                },
+            }
+        ).encode()
+
+    def batch_task(self, payload: dict) -> dict:
+        """Apply a ``batch/task`` request."""
+        id2etag = {}
+        for task in [*payload.get("add", []), *payload.get("update", [])]:
+            task = {**self.tasks.get(task["id"], {}), **task, "etag": _etag()}
+            self.tasks[task["id"]] = task
+            self._touch(task["id"])
+            id2etag[task["id"]] = task["etag"]
+        for item in payload.get("delete", []):
+            self._drop(item["taskId"])
+        return {"id2etag": id2etag, "id2error": {}}
+
+    def batch_objects(self, collection: dict, payload: dict, key: str) -> dict:
+        """Apply a ``batch/project``, ``batch/projectGroup`` or ``batch/tag`` request."""
+        id2etag = {}
+        for obj in [*payload.get("add", []), *payload.get("update", [])]:
+            obj = dict(obj)
+            if key == "id":
+                obj.setdefault("id", _object_id())
+            obj["etag"] = _etag()
+            collection[obj[key]] = {**collection.get(obj[key], {}), **obj}
+            id2etag[obj[key]] = obj["etag"]
+        for obj_id in payload.get("delete", []):
+            collection.pop(obj_id, None)
+        self._lists_changed()
+        return {"id2etag": id2etag, "id2error": {}}
+
+    def move_tasks(self, moves: list[dict]) -> dict:
+        """Apply a ``batch/taskProject`` request."""
+        id2etag = {}
+        for move in moves:
+            task = self.tasks.get(move["taskId"])
+            if task is not None:
+                task["projectId"] = move["toProjectId"]
+                task["etag"] = _etag()
+                self._touch(task["id"])
+                id2etag[task["id"]] = task["etag"]
+        return {"id2etag": id2etag, "id2error": {}}
+
+    def set_parents(self, items: list[dict]) -> dict:
+        """Apply a ``batch/taskParent`` request."""
+        id2etag = {}
+        for item in items:
+            task = self.tasks.get(item["taskId"])
+            if task is not None:
+                if item.get("parentId"):
+                    task["parentId"] = item["parentId"]
+                else:
+                    task.pop("parentId", None)
+                task["etag"] = _etag()
+                self._touch(task["id"])
+                id2etag[task["id"]] = task["etag"]
+        return {"id2etag": id2etag, "id2error": {}}
+
+    def merge_tags(self, name: str, new_name: str) -> None:
+        """Apply a ``tag/merge`` request."""
+        self.tags.pop(name, None)
+        for task in self.tasks.values():
+            if name in task.get("tags", ()):
+                task["tags"] = [new_name if tag == name else tag for tag in task["tags"]]
+                self._touch(task["id"])
+        self._lists_changed()
+
+    def completed_tasks(self, start: str, end: str, limit: int) -> list[dict]:
+        """Answer ``project/all/completed`` (newest first, inclusive range)."""
+        start_dt = datetime.datetime.strptime(start, QUERY_TIME_FORMAT)
+        end_dt = datetime.datetime.strptime(end, QUERY_TIME_FORMAT)
+        low = start_dt.strftime(TICKTICK_TIME_FORMAT)
+        high = end_dt.strftime(TICKTICK_TIME_FORMAT)
+        page = []
+        for task in self.completed:
+            if task["completedTime"] > high:
+                continue
+            if task["completedTime"] < low or len(page) >= limit:
+                break
+            page.append(task)
+        return page
+
+    def open_api_save(self, task: dict, task_id: str | None = None) -> dict:
+        """Apply an ``/open/v1/task`` create or update."""
+        task = dict(task)
+        task["id"] = task_id or task.get("id") or _object_id()
+        task.setdefault("projectId", self.inbox_id)
+        task = {**self.tasks.get(task["id"], {}), **task, "etag": _etag()}
+        self.tasks[task["id"]] = task
+        self._touch(task["id"])
+        return task
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockTickTickServer
+
+    routes = [
+        ("POST", re.compile(r"user/signon"), "signon"),
+        ("GET", re.compile(r"user/preferences/settings"), "settings"),
+        ("GET", re.compile(r"batch/check/(\d+)"), "check"),
+        ("POST", re.compile(r"batch/task"), "batch_task"),
+        ("POST", re.compile(r"batch/taskProject"), "task_project"),
+        ("POST", re.compile(r"batch/taskParent"), "task_parent"),
+        ("POST", re.compile(r"batch/tag"), "batch_tag"),
+        ("POST", re.compile(r"batch/project"), "batch_project"),
+        ("POST", re.compile(r"batch/projectGroup"), "batch_project_group"),
+        ("PUT", re.compile(r"tag/rename"), "rename_tag"),
+        ("PUT", re.compile(r"tag/merge"), "merge_tag"),
+        ("DELETE", re.compile(r"tag"), "delete_tag"),
+        ("GET", re.compile(r"project/all/completed"), "completed"),
+    ]
+    open_routes = [
+        ("POST", re.compile(r"/open/v1/task"), "open_create"),
+        ("POST", re.compile(r"/open/v1/task/([0-9a-z]+)"), "open_update"),
+        ("POST", re.compile(r"/open/v1/project/([0-9a-z]+)/task/([0-9a-z]+)/complete"), "open_complete"),
+    ]
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        """Keep the benchmark output quiet."""
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlparse(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        self.payload = json.loads(self.rfile.read(length)) if length else None
+        if url.path.startswith(API_PREFIX):
+            path, routes = url.path[len(API_PREFIX):], self.routes
+        else:
+            path, routes = url.path, self.open_routes
+        for route_method, pattern, handler in routes:
+            match = pattern.fullmatch(path)
+            if route_method == method and match:
+                self.server.requests += 1
+                try:
+                    with self.server.account.lock:
+                        body = getattr(self, f"_{handler}")(*match.groups())
+                except MockApiError as e:
+                    self._respond(e.status, {"errorMessage": str(e)})
+                    return
+                self._respond(200, body)
+                return
+        self._respond(404, {"errorMessage": f"No mock for {method} {url.path}"})
+
+    def _respond(self, status: int, body) -> None:
+        if not isinstance(body, bytes):
+            body = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @property
+    def account(self) -> MockAccount:
+        return self.server.account
+
+    def _signon(self):
+        return {"token": "mock-token", "inboxId": self.account.inbox_id}
+
+    def _settings(self):
+        return {"id": "mock-profile", "timeZone": "UTC"}
+
+    def _check(self, checkpoint: str):
+        return self.account.batch_check(int(checkpoint))
+
+    def _batch_task(self):
+        return self.account.batch_task(self.payload)
+
+    def _task_project(self):
+        return self.account.move_tasks(self.payload)
+
+    def _task_parent(self):
+        return self.account.set_parents(self.payload)
+
+    def _batch_tag(self):
+        return self.account.batch_objects(self.account.tags, self.payload, "name")
+
+    def _batch_project(self):
+        return self.account.batch_objects(self.account.projects, self.payload, "id")
+
+    def _batch_project_group(self):
+        folders = {folder["id"]: folder for folder in self.account.project_folders}
+        response = self.account.batch_objects(folders, self.payload, "id")
+        self.account.project_folders = list(folders.values())
+        return response
+
+    def _rename_tag(self):
+        tag = self.account.tags.pop(self.payload["name"])
+        new_name = self.payload["newName"].lower()
+        self.account.tags[new_name] = {**tag, "name": new_name, "label": self.payload["newName"], "etag": _etag()}
+        self.account._lists_changed()
+
+    def _merge_tag(self):
+        self.account.merge_tags(self.payload["name"], self.payload["newName"])
+
+    def _delete_tag(self):
+        self.account.tags.pop(self.query.get("name"), None)
+        self.account._lists_changed()
+
+    def _completed(self):
+        return self.account.completed_tasks(
+            self.query["from"], self.query["to"], int(self.query.get("limit", 100))
+        )
+
+    def _open_create(self):
+        return self.account.open_api_save(self.payload)
+
+    def _open_update(self, task_id: str):
+        return self.account.open_api_save(self.payload, task_id)
+
+    def _open_complete(self, project_id: str, task_id: str):
+        self.account.close_task(task_id)
+
+
+class MockTickTickServer(ThreadingHTTPServer):
+    """HTTP server answering TickTick API requests from a MockAccount."""
+
+    daemon_threads = True
+
+    def __init__(self, account: MockAccount, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Bind the server; port 0 picks a free port."""
+        super().__init__((host, port), _Handler)
+        self.account = account
+        self.requests = 0
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use in place of https://api.ticktick.com."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> MockTickTickServer:
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> MockTickTickServer:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    account = MockAccount(num_tasks=args.tasks, num_projects=args.projects, num_tags=args.tags)
+    server = MockTickTickServer(account, port=args.port)
+    print(f"Serving a {args.tasks} task account on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""Correctness tests of the TickTick clients against the mock server.
+
+Unlike the benchmarks these run on a small account rebuilt for every test,
+so they can change it the way another TickTick client would. The async
+client, which the integration runs, is driven with ``asyncio.run``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import random
+
+import pytest
+
+pytest.importorskip("homeassistant")
+aiohttp = pytest.importorskip("aiohttp")
+
+from mock_server import MockAccount, MockTickTickServer  # noqa: E402
+
+from custom_components.ticktick import convert_local_time_to_utc  # noqa: E402
+from custom_components.ticktick.state import IntervalIndex  # noqa: E402
+from custom_components.ticktick.streaming import streaming_available  # noqa: E402
+
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture
+def mock_server():
+    """A mock TickTick server with a small account, replacing the benchmarks' one."""
+    account = MockAccount(num_tasks=300, num_projects=5, num_tags=10, num_completed=250)
+    with MockTickTickServer(account) as server:
+        yield server
+
+
+def _server_tasks(account: MockAccount) -> dict:
+    return {task_id: task["etag"] for task_id, task in account.tasks.items()}
+
+
+def _client_tasks(client) -> dict:
+    return {task["id"]: task["etag"] for task in client.state["tasks"]}
+
+
+@pytest.fixture(params=[False, True], ids=["decoded", "streamed"])
+def stream_sync(request):
+    """Whether sync responses are streamed."""
+    if request.param and not streaming_available():
+        pytest.skip("ijson is not installed")
+    return request.param
+
+
+def _close_and_change(account: MockAccount) -> None:
+    """Change the account the way another TickTick client would."""
+    task_ids = list(account.tasks)
+    with account.lock:
+        account.batch_task(
+            {
+                "add": [{"id": "b" * 24, "projectId": account.inbox_id, "title": "New", "status": 0}],
+                "update": [{"id": task_ids[0], "title": "Renamed"}],
+                "delete": [{"taskId": task_ids[1], "projectId": account.tasks[task_ids[1]]["projectId"]}],
+            }
+        )
+        account.close_task(task_ids[2], status=2)
+        account.close_task(task_ids[3], status=-1)
+
+
+def test_delta_sync_merges_changes(make_client, mock_server, stream_sync):
+    """Updates, deletions and tasks closed elsewhere are merged into the local state."""
+    account = mock_server.account
+    client = make_client(incremental_sync=True, sync_on_write=False, stream_sync=stream_sync)
+    updated = next(iter(account.tasks))
+    _close_and_change(account)
+    last_full_sync = client.last_full_sync
+
+    client.sync()
+
+    assert client.last_full_sync == last_full_sync
+    assert client.checkpoint == account.checkpoint
+    assert _client_tasks(client) == _server_tasks(account)
+    assert client.get_by_id(updated, search="tasks")["title"] == "Renamed"
+    assert client.state["tasks"].find(status=2) == []
+    assert client.state["tasks"].find(status=-1) == []
+
+
+def test_expired_checkpoint_falls_back_to_full_sync(make_client, mock_server):
+    """A checkpoint the server rejects is replaced by a full snapshot."""
+    account = mock_server.account
+    client = make_client(incremental_sync=True, sync_on_write=False)
+    stale = client.checkpoint
+    with account.lock:
+        account.close_task(next(iter(account.tasks)))
+        account.expire_checkpoints()
+    last_full_sync = client.last_full_sync
+
+    client.sync()
+
+    assert client.last_full_sync > last_full_sync
+    assert client.checkpoint == account.checkpoint > stale
+    assert _client_tasks(client) == _server_tasks(account)
+
+
+def test_completed_pages_are_deduplicated(make_client, mock_server):
+    """Completed tasks sharing a second across page boundaries are returned once."""
+    account = mock_server.account
+    with account.lock:
+        # Groups of five tasks completed within the same second
+        for i, task in enumerate(account.completed):
+            task["completedTime"] = account.completed[i - i % 5]["completedTime"]
+    client = make_client(sync_on_write=False)
+    client.task.COMPLETED_PAGE_SIZE = 7
+    start, end = datetime.datetime(2024, 1, 1), datetime.datetime(2025, 1, 31)
+    expected = sorted(task["id"] for task in account.completed)
+
+    found = [task["id"] for task in client.task.get_completed(start, end, tz="UTC")]
+    assert sorted(found) == expected
+
+    windowed = client.task.iter_completed(start, end, tz="UTC", window=datetime.timedelta(days=30))
+    found = [task["id"] for task in windowed]
+    assert sorted(found) == expected
+
+
+def test_completed_pages_skip_crowded_second(make_client, mock_server, caplog):
+    """A second with more completed tasks than a page is skipped with a warning, not the rest of the range."""
+    account = mock_server.account
+    with account.lock:
+        crowded = account.completed[20:40]
+        for task in crowded:
+            task["completedTime"] = account.completed[20]["completedTime"]
+    client = make_client(sync_on_write=False)
+    client.task.COMPLETED_PAGE_SIZE = 7
+    start, end = datetime.datetime(2024, 1, 1), datetime.datetime(2025, 1, 31)
+
+    found = [task["id"] for task in client.task.get_completed(start, end, tz="UTC")]
+
+    assert len(found) == len(set(found))
+    crowded_ids = {task["id"] for task in crowded}
+    assert set(found) - crowded_ids == {task["id"] for task in account.completed} - crowded_ids
+    assert "some of them are skipped" in caplog.text
+
+
+def test_update_many_syncs_after_rejections(client, mock_server, monkeypatch):
+    """Tasks the server rejects are restored by a sync, partial updates need no projectId."""
+    account = mock_server.account
+    saved, rejected = list(client.state["tasks"])[:2]
+    title = rejected["title"]
+    apply = account.batch_task
+
+    def reject(payload):
+        response = apply({"update": [task for task in payload["update"] if task["id"] != rejected["id"]]})
+        response["id2error"] = {rejected["id"]: "EXCEED_QUOTA"}
+        return response
+
+    monkeypatch.setattr(account, "batch_task", reject)
+    syncs = client.metrics.syncs.count
+
+    with pytest.raises(RuntimeError):
+        client.task.update_many([{"id": saved["id"], "title": "Saved"}, {"id": rejected["id"], "title": "Lost"}])
+
+    assert client.metrics.syncs.count == syncs + 1
+    assert client.get_by_id(saved["id"], search="tasks")["title"] == "Saved"
+    assert client.get_by_id(rejected["id"], search="tasks")["title"] == title
+
+
+def test_reparent_rejects_cycles(client):
+    """A task cannot become a subtask of itself or of one of its subtasks."""
+    child = next(task for task in client.state["tasks"] if task.get("parentId"))
+    parent = client.get_by_id(child["parentId"], search="tasks")
+
+    with pytest.raises(ValueError):
+        client.task.reparent(parent, parent["id"])
+    with pytest.raises(ValueError):
+        client.task.reparent(parent, child["id"])
+
+    sibling = next(
+        task
+        for task in client.state["tasks"]
+        if task["projectId"] == parent["projectId"]
+        and task["id"] != parent["id"]
+        and not task.get("parentId")
+        and not client.task.children(task["id"])
+    )
+    client.task.reparent(sibling, parent["id"])
+    assert sibling["id"] in {task["id"] for task in client.task.descendants(parent["id"])}
+    assert [task["id"] for task in client.task.ancestors(sibling["id"])] == [parent["id"]]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"status": 0, "min_priority": 3},
+        {"tags": ["TAG1", "tag2"], "order_by": "priority", "reverse": True},
+        {
+            "due_after": datetime.datetime(2024, 3, 1, tzinfo=UTC),
+            "due_before": datetime.datetime(2024, 6, 1, tzinfo=UTC),
+            "order_by": "dueDate",
+            "limit": 10,
+        },
+        {"project": "inbox", "max_priority": 1, "order_by": "title"},
+    ],
+    ids=["all", "status_priority", "tags", "due_range", "inbox"],
+)
+def test_query_matches_brute_force(client, filters):
+    """query() returns what filtering and sorting every task returns."""
+    tasks = list(client.state["tasks"])
+    if "project" in filters:
+        tasks = [task for task in tasks if task["projectId"] == client.inbox_id]
+    if "status" in filters:
+        tasks = [task for task in tasks if task["status"] == filters["status"]]
+    if "tags" in filters:
+        wanted = {tag.lower() for tag in filters["tags"]}
+        tasks = [task for task in tasks if wanted & set(task["tags"])]
+    if "due_after" in filters:
+        low = filters["due_after"].strftime(client.task.DUE_DATE_FORMAT)
+        high = filters["due_before"].strftime(client.task.DUE_DATE_FORMAT)
+        tasks = [task for task in tasks if low <= task["dueDate"] <= high]
+    if "min_priority" in filters:
+        tasks = [task for task in tasks if task["priority"] >= filters["min_priority"]]
+    if "max_priority" in filters:
+        tasks = [task for task in tasks if task["priority"] <= filters["max_priority"]]
+
+    result = client.task.query(**filters)
+
+    if "order_by" not in filters:
+        assert sorted(task["id"] for task in result) == sorted(task["id"] for task in tasks)
+        return
+    field = client.task.SORT_FIELDS[filters["order_by"]]
+    values = sorted((task[field] for task in tasks), reverse=filters.get("reverse", False))
+    assert [task[field] for task in result] == values[: filters.get("limit")]
+    assert {task["id"] for task in result} <= {task["id"] for task in tasks}
+
+
+def test_interval_index_matches_brute_force():
+    """Overlap and next event queries agree with checking every interval."""
+    rng = random.Random(0)
+    intervals = []
+    for value in range(500):
+        start = rng.randrange(1000)
+        intervals.append((start, start + rng.choice((0, 1, 5, 30, 200)), value))
+    index = IntervalIndex(intervals)
+    by_start = sorted(intervals, key=lambda entry: entry[0])
+
+    def overlaps(entry, start, end):
+        entry_start, entry_end, _ = entry
+        return entry_start < end and (entry_end > start or entry_start >= start)
+
+    for _ in range(200):
+        start = rng.randrange(-50, 1250)
+        end = start + rng.randrange(1, 100)
+        expected = [value for entry in by_start if overlaps(entry, start, end) for value in entry[2:]]
+        assert sorted(index.overlapping(start, end)) == sorted(expected)
+
+        expected = next((entry[2] for entry in by_start if entry[1] > start or entry[0] >= start), None)
+        assert index.first_ending_after(start) == expected
+
+    assert IntervalIndex().overlapping(0, 10) == []
+    assert IntervalIndex().first_ending_after(0) is None
+
+
+def test_async_sync(make_async_client, mock_server, stream_sync):
+    """The async client merges deltas and downloads full snapshots like the sync one."""
+    account = mock_server.account
+
+    async def scenario():
+        async with aiohttp.ClientSession() as session:
+            client = await make_async_client(session, incremental_sync=True, sync_on_write=False, stream_sync=stream_sync)
+            assert _client_tasks(client) == _server_tasks(account)
+            last_full_sync = client.last_full_sync
+            _close_and_change(account)
+
+            await client.sync()
+            assert client.last_full_sync == last_full_sync
+            assert _client_tasks(client) == _server_tasks(account)
+
+            await client.sync(full=True)
+            assert client.last_full_sync > last_full_sync
+            assert _client_tasks(client) == _server_tasks(account)
+
+    asyncio.run(scenario())
+
+
+def test_async_move_many(make_async_client, mock_server):
+    """Tasks moved in concurrent chunks end up in the new project locally and on the server."""
+    account = mock_server.account
+
+    async def scenario():
+        async with aiohttp.ClientSession() as session:
+            client = await make_async_client(session, sync_on_write=False)
+            target = next(iter(account.projects))
+            tasks = [task for task in client.state["tasks"] if task["projectId"] != target][:30]
+            ids = {task["id"] for task in tasks}
+
+            moved = await client.task.move_many(tasks, target, chunk_size=7, max_concurrency=3)
+
+            assert {task["id"] for task in moved} == ids
+            assert all(client.get_by_id(task_id, search="tasks")["projectId"] == target for task_id in ids)
+            assert all(account.tasks[task_id]["projectId"] == target for task_id in ids)
+
+    asyncio.run(scenario())
+
+
+def test_async_completed_pages(make_async_client, mock_server):
+    """Paginated and windowed completed tasks come back exactly once."""
+    account = mock_server.account
+    with account.lock:
+        for i, task in enumerate(account.completed):
+            task["completedTime"] = account.completed[i - i % 5]["completedTime"]
+    expected = sorted(task["id"] for task in account.completed)
+    start, end = datetime.datetime(2024, 1, 1), datetime.datetime(2025, 1, 31)
+
+    async def scenario():
+        async with aiohttp.ClientSession() as session:
+            client = await make_async_client(session, sync_on_write=False)
+            client.task.COMPLETED_PAGE_SIZE = 7
+
+            found = await client.task.get_completed(start, end, tz="UTC")
+            assert sorted(task["id"] for task in found) == expected
+
+            windowed = client.task.iter_completed(start, end, tz="UTC", window=datetime.timedelta(days=30))
+            assert sorted([task["id"] async for task in windowed]) == expected
+
+    asyncio.run(scenario())
+
+
+def test_async_bulk_delete_tags(make_async_client, mock_server):
+    """Deleted tags are gone locally and on the server, unknown ones are reported."""
+    account = mock_server.account
+
+    async def scenario():
+        async with aiohttp.ClientSession() as session:
+            client = await make_async_client(session, sync_on_write=False)
+            labels = list(account.tags)[:3]
+
+            result = await client.tag.bulk_delete([*labels, "missing"])
+
+            assert sorted(result["succeeded"]) == sorted(labels)
+            assert list(result["failed"]) == ["missing"]
+            assert not set(labels) & {tag["name"] for tag in client.state["tags"]}
+            assert not set(labels) & set(account.tags)
+
+    asyncio.run(scenario())
+
+
+class _MemoryStore:
+    """Keeps the coordinator's snapshot in memory, in place of Home Assistant's Store."""
+
+    def __init__(self, snapshot=None) -> None:
+        self.snapshot = snapshot
+
+    async def async_load(self):
+        return self.snapshot
+
+    def async_delay_save(self, data_func, delay: float = 0) -> None:
+        self.snapshot = data_func()
+
+
+def test_coordinator_snapshot_then_delta_refresh(make_async_client, mock_server, tmp_path):
+    """The coordinator publishes a saved snapshot, then its refresh only fetches the changes."""
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.ticktick.coordinator import TickTickDataUpdateCoordinator
+
+    account = mock_server.account
+
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        async with aiohttp.ClientSession() as session:
+            saved = await make_async_client(session, incremental_sync=True, sync_on_write=False)
+            store = _MemoryStore(saved.dump_snapshot())
+            snapshot_tasks = _client_tasks(saved)
+            _close_and_change(account)
+
+            client = await make_async_client(session, prepare=False, incremental_sync=True, sync_on_write=False)
+            coordinator = TickTickDataUpdateCoordinator(hass, client, store)
+            assert await coordinator.async_load_snapshot()
+            published = {task["id"] for tasks in coordinator.data["tasks"].values() for task in tasks}
+            assert published == set(snapshot_tasks)
+            assert client.time_zone == "UTC"
+
+            requests = mock_server.requests
+            await coordinator.async_refresh()
+
+            assert coordinator.last_update_success
+            # The settings and one delta sync
+            assert mock_server.requests == requests + 2
+            assert client.last_full_sync == store.snapshot["last_full_sync"]
+            assert _client_tasks(client) == _server_tasks(account)
+            published = {task["id"] for tasks in coordinator.data["tasks"].values() for task in tasks}
+            assert published == set(account.tasks)
+            assert store.snapshot["checkpoint"] == account.checkpoint
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    ("local", "time_zone", "expected"),
+    [
+        # Skipped times keep the offset before the transition
+        (datetime.datetime(2019, 3, 31, 1, 0), "Europe/Dublin", datetime.datetime(2019, 3, 31, 1, 0)),
+        (datetime.datetime(2019, 3, 31, 1, 30), "Europe/Dublin", datetime.datetime(2019, 3, 31, 1, 30)),
+        (datetime.datetime(2021, 3, 14, 2, 30), "America/New_York", datetime.datetime(2021, 3, 14, 7, 30)),
+        # Ambiguous times resolve to standard time
+        (datetime.datetime(2019, 10, 27, 1, 30), "Europe/Dublin", datetime.datetime(2019, 10, 27, 0, 30)),
+        (datetime.datetime(2021, 11, 7, 1, 30), "America/New_York", datetime.datetime(2021, 11, 7, 6, 30)),
+        # Unambiguous times, any tzinfo and the microseconds are dropped
+        (datetime.datetime(2021, 7, 1, 12, 0, 0, 999), "America/New_York", datetime.datetime(2021, 7, 1, 16, 0)),
+        (datetime.datetime(2021, 1, 1, 9, 0, tzinfo=UTC), "Asia/Tokyo", datetime.datetime(2021, 1, 1, 0, 0)),
+    ],
+)
+def test_convert_local_time_to_utc(local, time_zone, expected):
+    """Local wall times convert to naive UTC as pytz's localize(is_dst=False) did."""
+    assert convert_local_time_to_utc(local, time_zone) == expected
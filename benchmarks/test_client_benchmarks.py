@@ -0,0 +1,172 @@
+"""Benchmarks of the TickTick client hot paths at 1k, 10k and 100k tasks."""
+
+from __future__ import annotations
+
+import itertools
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.ticktick.todo import (  # noqa: E402
+    _convert_api_item,
+    _convert_api_items,
+)
+
+BULK_SIZE = 500
+
+
+def test_full_sync(benchmark, client):
+    """Download and index the whole account."""
+    benchmark(client.sync, full=True)
+
+
+def test_full_sync_streamed(benchmark, make_client):
+    """Decode the whole account incrementally, keeping only the fields the integration reads."""
+    pytest.importorskip("ijson")
+    from custom_components.ticktick.const import SYNC_TASK_FIELDS
+
+    client = make_client(stream_sync=True, task_fields=SYNC_TASK_FIELDS)
+    benchmark(client.sync, full=True)
+
+
+def test_incremental_sync(benchmark, make_client):
+    """Request the changes since the last checkpoint."""
+    client = make_client(incremental_sync=True)
+    benchmark(client.sync)
+
+
+def test_get_by_id(benchmark, client):
+    """Look tasks up by id."""
+    ids = itertools.cycle([task["id"] for task in client.state["tasks"]])
+    benchmark(lambda: client.get_by_id(next(ids), search="tasks"))
+
+
+def test_get_by_id_unscoped(benchmark, client):
+    """Look tasks up by id without naming the collection."""
+    ids = itertools.cycle([task["id"] for task in client.state["tasks"]])
+    benchmark(lambda: client.get_by_id(next(ids)))
+
+
+def test_get_by_etag(benchmark, client):
+    """Look tasks up by etag."""
+    etags = itertools.cycle([task["etag"] for task in client.state["tasks"]])
+    benchmark(lambda: client.get_by_etag(next(etags), search="tasks"))
+
+
+def test_get_by_fields(benchmark, client):
+    """Find every task of a project."""
+    projects = itertools.cycle([project["id"] for project in client.state["projects"]])
+    benchmark(lambda: client.get_by_fields(projectId=next(projects), search="tasks"))
+
+
+def test_query(benchmark, client):
+    """Filter by project, tag and due range, ordered by due date."""
+    projects = [project["id"] for project in itertools.islice(client.state["projects"], 5)]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    benchmark(
+        client.task.query,
+        project=projects,
+        tags=["tag0", "tag1"],
+        due_after=start,
+        due_before=start + timedelta(days=180),
+        min_priority=1,
+        order_by="dueDate",
+    )
+
+
+def test_todo_items_conversion(benchmark, client):
+    """Convert every task into a TodoItem, as the todo entities do."""
+    tasks = list(client.state["tasks"])
+    benchmark(lambda: [_convert_api_item(task) for task in tasks])
+
+
+def test_todo_items_unchanged_refresh(benchmark, client):
+    """Convert every task again after a refresh that changed nothing."""
+    tasks = list(client.state["tasks"])
+    _, memo = _convert_api_items(tasks, {})
+    benchmark(lambda: _convert_api_items(tasks, memo))
+
+
+def test_calendar_month_window(benchmark, client):
+    """Answer calendar month windows from the event index, as the calendar entities do."""
+    from custom_components.ticktick.calendar import _build_event_index
+
+    index = _build_event_index(list(client.state["tasks"]))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    windows = itertools.cycle(
+        [(start + timedelta(days=30 * month), start + timedelta(days=30 * (month + 1))) for month in range(12)]
+    )
+    benchmark(lambda: index.overlapping(*next(windows)))
+
+
+def test_builder_many(benchmark, client):
+    """Build dated tasks for a bulk import."""
+    start = datetime(2024, 1, 1)
+    tasks = [
+        {"title": f"Import {i}", "startDate": start + timedelta(hours=i), "dueDate": start + timedelta(hours=i + 1)}
+        for i in range(BULK_SIZE)
+    ]
+    benchmark(client.task.builder_many, tasks)
+
+
+def test_create_many(benchmark, client):
+    """Create tasks through batch/task."""
+    counter = itertools.count()
+
+    def create():
+        client.task.create_many(
+            [{"title": f"Bulk {next(counter)}"} for _ in range(BULK_SIZE)]
+        )
+
+    benchmark(create)
+
+
+def test_update_many(benchmark, client):
+    """Update tasks through batch/task."""
+    tasks = [dict(task) for task in itertools.islice(client.state["tasks"], BULK_SIZE)]
+
+    def update():
+        for task in tasks:
+            task["title"] += "!"
+        client.task.update_many(tasks)
+
+    benchmark(update)
+
+
+def test_move(benchmark, client):
+    """Move a project's tasks back and forth between two projects."""
+    first, second = (project["id"] for project in itertools.islice(client.state["projects"], 2))
+    targets = itertools.cycle([(first, second), (second, first)])
+
+    def move():
+        old, new = next(targets)
+        tasks = client.task.get_from_project(old)
+        if tasks:
+            client.task.move(tasks, new)
+
+    benchmark(move)
+
+
+def test_move_many(benchmark, client):
+    """Move tasks from every project into one and back out again."""
+    first, second = (project["id"] for project in itertools.islice(client.state["projects"], 2))
+    tasks = list(itertools.islice(client.state["tasks"], BULK_SIZE))
+    targets = itertools.cycle([first, second])
+
+    def move():
+        client.task.move_many(tasks, next(targets))
+
+    benchmark(move)
+
+
+def test_delete(benchmark, client):
+    """Delete tasks through batch/task."""
+
+    def setup():
+        tasks = client.task.create_many([{"title": "Doomed"} for _ in range(BULK_SIZE)])
+        return (tasks,), {}
+
+    benchmark.pedantic(client.task.delete, setup=setup, rounds=5)
@@ -1,15 +1,23 @@
 """TickTick Mod Integration"""
 
 import re
-import pytz
+import asyncio
 import json
 import random
 import logging
+import hashlib
+import inspect
 import secrets
+import aiohttp
 import requests
 import datetime
+import email.utils
+import time
+import zoneinfo
 
-from functools import wraps
+from collections.abc import Mapping
+from functools import lru_cache, wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from calendar import monthrange
 
 from requests.adapters import HTTPAdapter
@@ -17,30 +25,92 @@ from urllib3.util.retry import Retry
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 
 # from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
 from homeassistant.const import Platform
-from .const import DOMAIN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_ACCESS_TOKEN
+from homeassistant.exceptions import ConfigEntryNotReady
+from .const import (DOMAIN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_ACCESS_TOKEN, CONF_ACCOUNT_KEY, CONF_MIN_SCAN_INTERVAL, CONF_MAX_SCAN_INTERVAL,
+                    DEFAULT_MIN_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL, STORAGE_KEY, STORAGE_VERSION, SYNC_TASK_FIELDS)
 from .coordinator import TickTickDataUpdateCoordinator
+from .exceptions import RateLimitError
+from .metrics import ClientMetrics, CountingReader, MetricsRetry
+from .state import IndexedCollection, TaskRecord, as_dict
+from .streaming import async_decode_sync_payload, decode_sync_payload, filter_task_fields, streaming_available
 
-PLATFORMS: list[Platform] = [Platform.TODO]
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR, Platform.TODO]
+# hass.data keys of the per-account registry shared by config entries
+ACCOUNTS = f"{DOMAIN}_accounts"
+ACCOUNTS_LOCK = f"{DOMAIN}_accounts_lock"
 
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+TICK_TICK_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S+0000'  # UTC dates as the API expects them
+UTC = datetime.timezone.utc
 ALID_HEX_VALUES = "^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$"
 
 _LOGGER = logging.getLogger(__name__)
 
-def requests_retry_session(retries=3, backoff_factor=1, status_forcelist=(405, 500, 502, 504), session=None, allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE'])):
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) timeout in seconds
+# Arguments the installed urllib3's Retry accepts, backoff_jitter and backoff_max are new in 2.0
+RETRY_PARAMETERS = frozenset(inspect.signature(Retry.__init__).parameters)
+
+
+def parse_retry_after(value) -> float | None:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    # requests has no session wide timeout, so the adapter fills one in for every request
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def requests_retry_session(retries=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504), session=None, allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+                           backoff_jitter=0.5, backoff_max=60, respect_retry_after_header=True,
+                           pool_connections=10, pool_maxsize=10, pool_block=False, timeout=DEFAULT_TIMEOUT, on_retry=None):
     session = session or requests.session()
-    retry = Retry(
+    # urllib3 1.26, which older Home Assistant releases pin, neither jitters nor takes a backoff cap
+    backoff_options = {name: value for name, value in {'backoff_jitter': backoff_jitter, 'backoff_max': backoff_max}.items()
+                       if name in RETRY_PARAMETERS}
+    # MetricsRetry reports each retry to on_retry, TickTickClient hooks its metrics in there
+    retry = MetricsRetry(
         total=retries,
         read=retries,
         connect=retries,
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
-        allowed_methods=allowed_methods
+        allowed_methods=allowed_methods,
+        respect_retry_after_header=respect_retry_after_header,
+        # Hand the last response back once the retries are used up, so check_status_code
+        # turns a 429 into a RateLimitError with its Retry-After instead of a RetryError
+        raise_on_status=False,
+        on_retry=on_retry,
+        **backoff_options
+    )
+    adapter = TimeoutHTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        timeout=timeout
     )
-    adapter = HTTPAdapter(max_retries=retry)
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
@@ -49,9 +119,10 @@ def requests_retry_session(retries=3, backoff_factor=1, status_forcelist=(405, 5
 class OAuth2:
     OAUTH_AUTHORIZE_URL = "https://ticktick.com/oauth/authorize"
     OBTAIN_TOKEN_URL = "https://ticktick.com/oauth/token"
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str, access_token: str, scope: str = "tasks:write tasks:read", state: str = None, session=None):
-        # If a proper session is passed then we will just use the existing session
-        self.session = session or requests_retry_session()
+    def __init__(self, client_id: str, client_secret: str, redirect_uri: str, access_token: str, scope: str = "tasks:write tasks:read", state: str = None, session=None, session_options: dict = None):
+        # If a proper session is passed then we will just use the existing session,
+        # otherwise session_options are passed on to requests_retry_session
+        self.session = session or requests_retry_session(**(session_options or {}))
         # Set the client_id
         self._client_id = client_id
         # Set the client_secret
@@ -67,23 +138,45 @@ class OAuth2:
         # Set the access token
         self.access_token_info = json.loads(access_token)
 
+@lru_cache(maxsize=None)
+def get_time_zone(time_zone: str) -> zoneinfo.ZoneInfo:
+    # Raises zoneinfo.ZoneInfoNotFoundError (a KeyError) or ValueError for invalid names
+    return zoneinfo.ZoneInfo(time_zone)
+
+def _localize(original_time, zone: zoneinfo.ZoneInfo) -> datetime.datetime:
+    # The wall time is read in zone to the second, any tzinfo is ignored. Skipped times
+    # keep the offset before the transition and ambiguous times resolve to standard time,
+    # as pytz's localize(is_dst=False) did. The fold is chosen from the offsets, not the
+    # sign of dst(), which is negative in zones like Europe/Dublin
+    first = original_time.replace(tzinfo=zone, microsecond=0, fold=0)
+    second = first.replace(fold=1)
+    if first.utcoffset() <= second.utcoffset():
+        return first
+    # Overlap: the side without daylight saving is standard time
+    return first if not first.dst() and second.dst() else second
+
+def convert_local_times_to_utc(times, time_zone: str) -> list:
+    zone = get_time_zone(time_zone)
+    return [_localize(time, zone).astimezone(UTC).replace(tzinfo=None) for time in times]
+
 def convert_local_time_to_utc(original_time, time_zone: str):
-    utc = pytz.utc
-    time_zone = pytz.timezone(time_zone)
-    original_time = original_time.strftime(DATE_FORMAT)
-    time_object = datetime.datetime.strptime(original_time, DATE_FORMAT)
-    time_zone_dt = time_zone.localize(time_object)
-    return time_zone_dt.astimezone(utc).replace(tzinfo=None)
+    return _localize(original_time, get_time_zone(time_zone)).astimezone(UTC).replace(tzinfo=None)
 
+def convert_dates_to_tick_tick_format(datetimes, tz: str) -> list:
+    # Converts a whole list of dates with a single time zone lookup
+    return [date.strftime(TICK_TICK_DATE_FORMAT) for date in convert_local_times_to_utc(datetimes, tz)]
 
 def convert_date_to_tick_tick_format(datetime_obj, tz: str):
-    date = convert_local_time_to_utc(datetime_obj, tz)
-    date = date.replace(tzinfo=datetime.timezone.utc).isoformat()
-    date = date[::-1].replace(":", "", 1)[::-1]
-    return date
+    return convert_local_time_to_utc(datetime_obj, tz).strftime(TICK_TICK_DATE_FORMAT)
 
 class TaskManager:
     TASK_CREATE_ENDPOINT = "/open/v1/task"
+    BATCH_SIZE = 100  # Default number of tasks sent per batch/task request
+    COMPLETED_PAGE_SIZE = 100  # Number of completed tasks requested per page
+    MAX_CONCURRENCY = 4  # Default number of batch requests in flight at once
+    COMPLETED_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+    DUE_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.000+0000'  # Format of the dates in synced tasks, comparable as strings
+    SORT_FIELDS = {'project': 'projectId', 'dueDate': 'dueDate', 'title': 'title', 'priority': 'priority'}
     def __init__(self, client_class):
         self._client = client_class
         self.oauth_access_token = ''
@@ -94,37 +187,134 @@ class TaskManager:
     def _generate_create_url(self):
         CREATE_ENDPOINT = "/open/v1/task"
         return self._client.OPEN_API_BASE_URL + CREATE_ENDPOINT
+    def _store_local(self, task: dict) -> dict:
+        # Merge a task returned by the server into the local state without a sync
+        if task.get('projectId') == 'inbox':
+            task['projectId'] = self._client.inbox_id
+        tasks = self._client.state['tasks']
+        current = tasks.get(task['id'])
+        if current is not None and current is not task:
+            if 'etag' not in task:
+                current.pop('etag', None)  # The stored etag is stale until the next sync
+            current.update(task)
+            task = current
+        return tasks.upsert(task)
+    def _patch_local(self, task_id: str, etag: str = None, **fields) -> dict:
+        # Update fields of a task already in the local state, re-indexing it
+        tasks = self._client.state['tasks']
+        current = tasks.get(task_id)
+        if current is None:
+            return {}
+        if etag is None:
+            current.pop('etag', None)  # The stored etag is stale until the next sync
+        else:
+            fields['etag'] = etag
+        current.update(fields)
+        return tasks.upsert(current)
+    def _patch_from_response(self, response, ids, **fields) -> None:
+        id2etag = response.get('id2etag') or {} if isinstance(response, dict) else {}
+        for task_id in ids:
+            self._patch_local(task_id, id2etag.get(task_id), **fields)
+    def _after_save(self, response) -> bool:
+        # Shared by the sync and async managers: applies a saved task locally, returns whether a sync is needed instead
+        if response.get('projectId') == 'inbox':
+            response['projectId'] = self._client.inbox_id
+        if self._client.sync_on_write:
+            return True
+        self._store_local(response)
+        return False
     def create(self, task):
         url = self._generate_create_url()
-        response = self._client.http_post(url=url, json=task, headers=self.oauth_headers)
-        self._client.sync()
-        if response['projectId'] == 'inbox':
-            response['projectId'] = self._client.inbox_id
+        response = self._client.http_post(url=url, json=as_dict(task), headers=self.oauth_headers)
+        if self._after_save(response):
+            self._client.sync()
         return response
     def _generate_update_url(self, taskID: str):
         UPDATE_ENDPOINT = f"/open/v1/task/{taskID}"
         return self._client.OPEN_API_BASE_URL + UPDATE_ENDPOINT
     def update(self, task):
         url = self._generate_update_url(task['id'])
-        response = self._client.http_post(url=url, json=task, headers=self.oauth_headers)
-        self._client.sync()
+        response = self._client.http_post(url=url, json=as_dict(task), headers=self.oauth_headers)
+        if self._after_save(response):
+            self._client.sync()
         return response
     def _generate_mark_complete_url(self, projectID, taskID):
         COMPLETE_ENDPOINT = f"/open/v1/project/{projectID}/task/{taskID}/complete"
         return self._client.OPEN_API_BASE_URL + COMPLETE_ENDPOINT
+    def _after_complete(self, task: dict) -> bool:
+        if self._client.sync_on_write:
+            return True
+        self._client.state['tasks'].remove(task['id'])  # Completed tasks are not part of the synced state
+        return False
     def complete(self, task: dict):
         url = self._generate_mark_complete_url(task['projectId'], task['id'])
-        response = self._client.http_post(url=url, json=task, headers=self.oauth_headers)
-        self._client.sync()
+        response = self._client.http_post(url=url, json=as_dict(task), headers=self.oauth_headers)
+        if self._after_complete(task):
+            self._client.sync()
         if response == '':
             return task
         return response
-    def _generate_delete_url(self):
+    def _generate_batch_url(self):
         return self._client.BASE_URL + 'batch/task'
-    def delete(self, task):
-        url = self._generate_delete_url()
+    def _generate_delete_url(self):
+        return self._generate_batch_url()
+    def _batch_tasks(self, tasks, add: bool) -> list:
+        if isinstance(tasks, Mapping):
+            tasks = [tasks]
+        if not isinstance(tasks, list):
+            raise TypeError('Tasks must be a dict or list of dicts')
+        for task in tasks:
+            if not isinstance(task, Mapping):
+                raise TypeError('Tasks must be a dict or list of dicts')
+            if add:
+                task.setdefault('id', secrets.token_hex(12))  # Ids of new tasks are generated by the client
+                task.setdefault('projectId', self._client.inbox_id)
+            elif 'id' not in task:
+                raise ValueError('Tasks must have an id to be updated')
+            elif 'projectId' not in task and (current := self._client.state['tasks'].get(task['id'])) is not None:
+                task['projectId'] = current['projectId']  # Updates may leave the project out
+            if task.get('projectId') == 'inbox':
+                task['projectId'] = self._client.inbox_id
+        return tasks
+    def _batch_chunks(self, tasks: list, chunk_size: int = None) -> list:
+        chunk_size = self.BATCH_SIZE if chunk_size is None else chunk_size
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be at least 1')
+        return [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    def _apply_batch_response(self, chunk: list, response: dict, errors: dict) -> None:
+        id2etag = response.get('id2etag') or {}
+        errors.update(response.get('id2error') or {})
+        for task in chunk:
+            if task['id'] not in id2etag:
+                continue
+            task['etag'] = id2etag[task['id']]
+            if not self._client.sync_on_write:
+                self._store_local(as_dict(task))
+    @staticmethod
+    def _check_batch_errors(errors: dict) -> None:
+        if errors:
+            raise RuntimeError(f"Could Not Save Tasks: {errors}")
+    @staticmethod
+    def _save_payload(action: str, chunk: list) -> dict:
+        return {action: [as_dict(task) for task in chunk]}
+    def _save_many(self, action: str, tasks: list, chunk_size: int = None) -> list:
+        url = self._generate_batch_url()
+        errors = {}
+        for chunk in self._batch_chunks(tasks, chunk_size):
+            response = self._client.http_post(url, json=self._save_payload(action, chunk), cookies=self._client.cookies, headers=self.headers)
+            self._apply_batch_response(chunk, response, errors)
+        # Rejected tasks were not applied locally, a sync brings the state back in line with the server
+        if self._client.sync_required({'id2error': errors}):
+            self._client.sync()
+        self._check_batch_errors(errors)
+        return tasks
+    def create_many(self, tasks, chunk_size: int = None) -> list:
+        return self._save_many('add', self._batch_tasks(tasks, add=True), chunk_size)
+    def update_many(self, tasks, chunk_size: int = None) -> list:
+        return self._save_many('update', self._batch_tasks(tasks, add=False), chunk_size)
+    def _delete_payload(self, task) -> list:
         to_delete = []
-        if isinstance(task, dict):
+        if isinstance(task, Mapping):
             if task['projectId'] == 'inbox':
                 task['projectId'] = self._client.inbox_id
             delete_dict = {'projectId': task['projectId'], 'taskId': task['id']}
@@ -135,45 +325,38 @@ class TaskManager:
                     item['projectId'] = self._client.inbox_id
                 delete_dict = {'projectId': item['projectId'], 'taskId': item['id']}
                 to_delete.append(delete_dict)
+        return to_delete
+    def _after_delete(self, to_delete: list) -> bool:
+        if self._client.sync_on_write:
+            return True
+        for item in to_delete:
+            self._client.state['tasks'].remove(item['taskId'])
+        return False
+    def delete(self, task):
+        url = self._generate_delete_url()
+        to_delete = self._delete_payload(task)
         payload = {'delete': to_delete}
         self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        if self._after_delete(to_delete):
+            self._client.sync()
         return task
+    def _local_tasks(self, ids: list):
+        tasks = []
+        for task_id in ids:
+            tasks.append(self._client.get_by_id(task_id, search='tasks'))
+        if len(tasks) == 1:
+            return tasks[0]  # Return just the dictionary object if its a single task
+        else:
+            return tasks
     def make_subtask(self, obj, parent: str):
-        if not isinstance(obj, dict) and not isinstance(obj, list):
-            raise TypeError('obj must be a dictionary or list of dictionaries')
         if not isinstance(parent, str):
             raise TypeError('parent must be a string')
-        if isinstance(obj, dict):
-            obj = [obj]
-        parent_obj = self._client.get_by_id(search='tasks', obj_id=parent)
-        if not parent_obj:
-            raise ValueError("Parent task must exist before creating sub-tasks")
-        ids = []
-        for o in obj:
-            if o['projectId'] != parent_obj['projectId']:
-                raise ValueError("All tasks must be in the same project as the parent")
-            ids.append(o['id'])
-        subtasks = []
-        for i in ids:  # Create the object dictionaries for setting the subtask
-            temp = {
-                'parentId': parent,
-                'projectId': parent_obj['projectId'],
-                'taskId': i
-            }
-            subtasks.append(temp)
-        url = self._client.BASE_URL + 'batch/taskParent'
-        response = self._client.http_post(url, json=subtasks, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        subtasks = []
-        for task_id in ids:
-            subtasks.append(self._client.get_by_id(task_id, search='tasks'))
-        if len(subtasks) == 1:
-            return subtasks[0]  # Return just the dictionary object if its a single task
-        else:
-            return subtasks
-    def move(self, obj, new: str):
-        if not isinstance(obj, dict) and not isinstance(obj, list):
+        tasks = self.reparent(obj, parent)
+        if len(tasks) == 1:
+            return tasks[0]  # Return just the dictionary object if its a single task
+        return tasks
+    def _move_payload(self, obj, new: str) -> list:
+        if not isinstance(obj, Mapping) and not isinstance(obj, list):
             raise TypeError('obj should be a dict or list of dicts')
         if not isinstance(new, str):
             raise TypeError('new should be a string')
@@ -181,7 +364,7 @@ class TaskManager:
             project = self._client.get_by_id(new, search='projects')
             if not project:
                 raise ValueError('The ID for the new project does not exist')
-        if isinstance(obj, dict):
+        if isinstance(obj, Mapping):
             obj = [obj]
         move_tasks = []
         project_id = obj[0]['projectId']
@@ -194,19 +377,22 @@ class TaskManager:
                     'taskId': task['id'],
                     'toProjectId': new
                 })
+        return move_tasks
+    def _after_patch(self, response, ids: list, **fields) -> bool:
+        # Sets fields on the saved tasks locally, returns whether the response asks for a sync instead
+        if self._client.sync_required(response):
+            return True
+        self._patch_from_response(response, ids, **fields)
+        return False
+    def move(self, obj, new: str):
+        move_tasks = self._move_payload(obj, new)
         url = self._client.BASE_URL + 'batch/taskProject'
-        self._client.http_post(url, json=move_tasks, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        response = self._client.http_post(url, json=move_tasks, cookies=self._client.cookies, headers=self.headers)
+        if self._after_patch(response, [task['taskId'] for task in move_tasks], projectId=new):
+            self._client.sync()
         # Return the tasks in the new list
-        ids = [x['id'] for x in obj]
-        return_list = []
-        for i in ids:
-            return_list.append(self._client.get_by_id(i))
-        if len(return_list) == 1:
-            return return_list[0]
-        else:
-            return return_list
-    def move_all(self, old: str, new: str) -> list:
+        return self._local_tasks([x['taskId'] for x in move_tasks])
+    def _move_all_payload(self, old: str, new: str):
         if old != self._client.inbox_id:
             old_list = self._client.get_by_fields(id=old, search='projects')
             if not old_list:
@@ -216,8 +402,6 @@ class TaskManager:
             if not new_list:
                 raise ValueError(f"Project Id '{new}' Does Not Exist")
         tasks = self.get_from_project(old)
-        if not tasks:
-            return tasks  # No tasks to move so just return the empty list
         task_project = []  # List containing all the tasks that will be updated
         for task in tasks:
             task_project.append({
@@ -225,22 +409,180 @@ class TaskManager:
                 'taskId': task['id'],
                 'toProjectId': new
             })
+        return tasks, task_project
+    def move_all(self, old: str, new: str) -> list:
+        tasks, task_project = self._move_all_payload(old, new)
+        if not tasks:
+            return tasks  # No tasks to move so just return the empty list
         url = self._client.BASE_URL + 'batch/taskProject'
-        self._client.http_post(url, json=task_project, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        response = self._client.http_post(url, json=task_project, cookies=self._client.cookies, headers=self.headers)
+        if self._after_patch(response, [task['id'] for task in tasks], projectId=new):
+            self._client.sync()
         return self._client.task.get_from_project(new)
+    def _move_many_payload(self, tasks, new: str) -> list:
+        # Unlike _move_payload the tasks may come from any project, tasks already in the new project are skipped
+        if isinstance(tasks, Mapping):
+            tasks = [tasks]
+        if not isinstance(tasks, list) or not all(isinstance(task, Mapping) for task in tasks):
+            raise TypeError('Tasks must be a dict or list of dicts')
+        if new != self._client.inbox_id and new not in self._client.state['projects']:
+            raise ValueError(f"Project Id '{new}' Does Not Exist")
+        move_tasks = []
+        for task in tasks:
+            project_id = self._client.inbox_id if task['projectId'] == 'inbox' else task['projectId']
+            if project_id != new:
+                move_tasks.append({'fromProjectId': project_id, 'taskId': task['id'], 'toProjectId': new})
+        return move_tasks
+    def _apply_chunk_responses(self, chunks: list, responses: list, **fields) -> dict:
+        # responses holds None for chunks whose request failed, the id2error entries of the others are returned
+        errors = {}
+        for response in responses:
+            if isinstance(response, dict):
+                errors.update(response.get('id2error') or {})
+        if self._client.sync_on_write or errors:
+            return errors
+        for chunk, response in zip(chunks, responses):
+            if response is not None:
+                self._patch_from_response(response, [item['taskId'] for item in chunk], **fields)
+        return errors
+    def _payload_tasks(self, payload: list) -> list:
+        tasks = self._client.state['tasks']
+        return [tasks.get(item['taskId']) for item in payload if item['taskId'] in tasks]
+    def _after_chunks(self, payload: list, errors: dict, failure: Exception = None) -> list:
+        if failure is not None:
+            raise failure  # The chunks that were sent are already applied to the local state
+        self._check_batch_errors(errors)
+        return self._payload_tasks(payload)
+    def _send_chunks(self, url: str, chunks: list, max_concurrency: int = None):
+        # Returns the response of every chunk, None where its request failed, and the first failure
+        responses, failure = [None] * len(chunks), None
+        with ThreadPoolExecutor(max_workers=min(max_concurrency or self.MAX_CONCURRENCY, len(chunks))) as executor:
+            futures = {
+                executor.submit(self._client.http_post, url, json=chunk, cookies=self._client.cookies, headers=self.headers): i
+                for i, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                try:
+                    responses[futures[future]] = future.result()
+                except Exception as e:
+                    failure = failure or e
+        return responses, failure
+    def _post_chunks(self, url: str, payload: list, chunk_size: int = None, max_concurrency: int = None, **fields) -> list:
+        # Sends the payload in concurrent chunks and sets fields on the tasks of every chunk that was saved
+        if not payload:
+            return []
+        chunks = self._batch_chunks(payload, chunk_size)
+        responses, failure = self._send_chunks(url, chunks, max_concurrency)
+        errors = self._apply_chunk_responses(chunks, responses, **fields)
+        if self._client.sync_on_write or errors:
+            self._client.sync()
+        return self._after_chunks(payload, errors, failure)
+    def move_many(self, tasks, new: str, chunk_size: int = None, max_concurrency: int = None) -> list:
+        move_tasks = self._move_many_payload(tasks, new)
+        url = self._client.BASE_URL + 'batch/taskProject'
+        return self._post_chunks(url, move_tasks, chunk_size, max_concurrency, projectId=new)
+    def children(self, task_id: str) -> list:
+        return self._client.state['tasks'].find(parentId=task_id)
+    def descendants(self, task_id: str) -> list:
+        # Depth first, every subtask follows its parent
+        found, seen = [], {task_id}
+        stack = self.children(task_id)[::-1]
+        while stack:
+            task = stack.pop()
+            if task['id'] in seen:
+                continue  # Guards against parentId cycles
+            seen.add(task['id'])
+            found.append(task)
+            stack.extend(self.children(task['id'])[::-1])
+        return found
+    def ancestors(self, task_id: str) -> list:
+        # Nearest parent first
+        tasks = self._client.state['tasks']
+        found, seen = [], {task_id}
+        task = tasks.get(task_id)
+        while task is not None and task.get('parentId') and task['parentId'] not in seen:
+            task = tasks.get(task['parentId'])
+            if task is not None:
+                seen.add(task['id'])
+                found.append(task)
+        return found
+    def _parent_payload(self, tasks, parent: str = None) -> list:
+        if not isinstance(tasks, Mapping) and not isinstance(tasks, list):
+            raise TypeError('obj must be a dictionary or list of dictionaries')
+        if parent is not None and not isinstance(parent, str):
+            raise TypeError('parent must be a string')
+        if isinstance(tasks, Mapping):
+            tasks = [tasks]
+        parent_obj = None
+        if parent is not None:
+            parent_obj = self._client.state['tasks'].get(parent)
+            if parent_obj is None:
+                raise ValueError("Parent task must exist before creating sub-tasks")
+            lineage = {parent} | {task['id'] for task in self.ancestors(parent)}
+        payload = []
+        local = self._client.state['tasks']
+        for task in tasks:
+            task = local.get(task['id'], task)  # The caller's copy may predate the last sync
+            if parent_obj is None:
+                if task.get('parentId'):
+                    payload.append({'oldParentId': task['parentId'], 'projectId': task['projectId'], 'taskId': task['id']})
+                continue
+            if task['projectId'] != parent_obj['projectId']:
+                raise ValueError("All tasks must be in the same project as the parent")
+            if task['id'] in lineage:
+                raise ValueError(f"Task '{task['id']}' Cannot Become A Subtask Of Its Own Subtask")
+            payload.append({'parentId': parent, 'projectId': parent_obj['projectId'], 'taskId': task['id']})
+        return payload
+    def reparent(self, tasks, parent: str = None, chunk_size: int = None, max_concurrency: int = None) -> list:
+        # Makes the tasks subtasks of parent, or top level tasks when parent is None
+        payload = self._parent_payload(tasks, parent)
+        url = self._client.BASE_URL + 'batch/taskParent'
+        return self._post_chunks(url, payload, chunk_size, max_concurrency, parentId=parent)
+    def _query_date(self, value, tz: str = None) -> str:
+        if not isinstance(value, datetime.datetime):
+            raise TypeError('Dates Must Be Datetime Objects')
+        if value.tzinfo is None:
+            value = convert_local_time_to_utc(value, tz or self._client.time_zone)
+        else:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.strftime(self.DUE_DATE_FORMAT)
+    def _sort_field(self, order_by) -> str:
+        if isinstance(order_by, int):
+            order_by = TagsManager.SORT_DICTIONARY.get(order_by, order_by)
+        if order_by not in self.SORT_FIELDS:
+            raise ValueError(f"Invalid Sort '{order_by}' -> Must Be One Of {sorted(self.SORT_FIELDS)} Or 0, 1, 2 or 3")
+        return self.SORT_FIELDS[order_by]
+    def query(self, project=None, status=None, tags=None, due_after: datetime.datetime = None, due_before: datetime.datetime = None,
+              min_priority: int = None, max_priority: int = None, order_by=None, reverse: bool = False, limit: int = None,
+              tz: str = None) -> list:
+        # Filters combine with AND, a list of projects, statuses or tags matches any of them. Always returns a list
+        any_of, between = {}, {}
+        if project is not None:
+            projects = [project] if isinstance(project, str) else project
+            any_of['projectId'] = [self._client.inbox_id if p == 'inbox' else p for p in projects]
+        if status is not None:
+            any_of['status'] = [status] if isinstance(status, int) else status
+        if tags is not None:
+            any_of['tags'] = [tag.lower() for tag in ([tags] if isinstance(tags, str) else tags)]
+        if due_after is not None or due_before is not None:
+            between['dueDate'] = (None if due_after is None else self._query_date(due_after, tz),
+                                  None if due_before is None else self._query_date(due_before, tz))
+        if min_priority is not None or max_priority is not None:
+            between['priority'] = (min_priority, max_priority)
+        return self._client.state['tasks'].select(
+            any_of=any_of, between=between, order_by=None if order_by is None else self._sort_field(order_by),
+            reverse=reverse, limit=limit)
     def get_from_project(self, project: str):
         if project != self._client.inbox_id:
             obj = self._client.get_by_fields(id=project, search='projects')
             if not obj:
                 raise ValueError(f"List Id '{project}' Does Not Exist")
         tasks = self._client.get_by_fields(projectId=project, search='tasks')
-        if isinstance(tasks, dict):
+        if isinstance(tasks, Mapping):
             return [tasks]
         else:
             return tasks
-    def get_completed(self, start, end=None, full: bool = True, tz: str = None) -> list:
-        url = self._client.BASE_URL + 'project/all/completed'
+    def _completed_range(self, start, end=None, full: bool = True, tz: str = None):
         if tz is None:
             tz = self._client.time_zone
         if not isinstance(start, datetime.datetime):
@@ -249,8 +591,10 @@ class TaskManager:
             raise TypeError('End Must Be A Datetime Object')
         if end is not None and start > end:
             raise ValueError('Invalid Date Range: Start Date Occurs After End Date')
-        if tz not in pytz.all_timezones_set:
-            raise KeyError('Invalid Time Zone')
+        try:
+            get_time_zone(tz)
+        except (KeyError, ValueError):
+            raise KeyError('Invalid Time Zone') from None
         if end is None:
             start = datetime.datetime(start.year, start.month, start.day, 0, 0, 0)
             end = datetime.datetime(start.year, start.month, start.day, 23, 59, 59)
@@ -259,33 +603,78 @@ class TaskManager:
             end = datetime.datetime(end.year, end.month, end.day, 23, 59, 59)
         start = convert_local_time_to_utc(start, tz)
         end = convert_local_time_to_utc(end, tz)
-        parameters = {
+        return start, end
+    @staticmethod
+    def _completed_windows(start, end, window: datetime.timedelta = None) -> list:
+        if window is None:
+            return [(start, end)]
+        if window <= datetime.timedelta(0):
+            raise ValueError('Window must be a positive timedelta')
+        windows = []
+        while start <= end:
+            # The API works with whole seconds, so consecutive windows must not share a second
+            window_end = min(start + window - datetime.timedelta(seconds=1), end)
+            windows.append((start, window_end))
+            start = window_end + datetime.timedelta(seconds=1)
+        return windows
+    def _completed_parameters(self, start, end) -> dict:
+        return {
             'from': start.strftime(DATE_FORMAT),
-            'to': end.strftime(DATE_FORMAT),
-            'limit': 100
+            'to': end.strftime(DATE_FORMAT) if isinstance(end, datetime.datetime) else end,
+            'limit': self.COMPLETED_PAGE_SIZE
         }
-        response = self._client.http_get(url, params=parameters, cookies=self._client.cookies, headers=self.headers)
-        return response
-    def dates(self, start, due=None, tz=None):
-        dates = {}
-        if tz is not None:
-            dates['timeZone'] = tz
-        else:
-            tz = self._client.time_zone
+    def _next_completed_page(self, page: list, seen: set):
+        # Pages are sorted by completion time, newest first. The next page ends at the
+        # completion time of the last task; tasks sharing that second are skipped.
+        new_tasks = [task for task in page if task['id'] not in seen]
+        if len(page) < self.COMPLETED_PAGE_SIZE:
+            return new_tasks, None, set()
+        last = page[-1]['completedTime']
+        cursor = datetime.datetime.strptime(last, self.COMPLETED_TIME_FORMAT).astimezone(datetime.timezone.utc)
+        if not new_tasks:
+            # More tasks share this second than fit in a page, the API cannot page through
+            # them, so the rest of the range is fetched from the second before
+            _LOGGER.warning("More than %s tasks were completed at %s, some of them are skipped",
+                            self.COMPLETED_PAGE_SIZE, last)
+            return [], (cursor - datetime.timedelta(seconds=1)).strftime(DATE_FORMAT), set()
+        return new_tasks, cursor.strftime(DATE_FORMAT), {task['id'] for task in page if task['completedTime'] == last}
+    def _iter_completed_window(self, start, end):
+        url = self._client.BASE_URL + 'project/all/completed'
+        cursor, seen = end, set()
+        while cursor is not None:
+            parameters = self._completed_parameters(start, cursor)
+            page = self._client.http_get(url, params=parameters, cookies=self._client.cookies, headers=self.headers)
+            tasks, cursor, seen = self._next_completed_page(page or [], seen)
+            yield from tasks
+    def _completed_plan(self, start, end, full: bool, tz: str, window: datetime.timedelta) -> list:
+        # Returns the UTC windows whose pages iter_completed requests
+        start, end = self._completed_range(start, end, full, tz)
+        return self._completed_windows(start, end, window)
+    def iter_completed(self, start, end=None, full: bool = True, tz: str = None,
+                       window: datetime.timedelta = None, max_workers: int = 4):
+        windows = self._completed_plan(start, end, full, tz, window)
+        if len(windows) == 1 or max_workers <= 1:
+            for window_start, window_end in windows:
+                yield from self._iter_completed_window(window_start, window_end)
+            return
+        # Windows are fetched concurrently and yielded as each one finishes
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(lambda r: list(self._iter_completed_window(*r)), r) for r in windows]
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    def get_completed(self, start, end=None, full: bool = True, tz: str = None) -> list:
+        return list(self.iter_completed(start, end, full=full, tz=tz))
+    @staticmethod
+    def _local_dates(start, due=None):
+        # Returns the wall times dates() converts and whether the task is all day
         if due is None:
-            if start.hour != 0 or start.minute != 0 or start.second != 0 or start.microsecond != 0:
-                dates['startDate'] = convert_date_to_tick_tick_format(start, tz)
-                dates['allDay'] = False
-            else:
-                dates['startDate'] = convert_date_to_tick_tick_format(start, tz)
-                dates['allDay'] = True
-            return dates
+            return [start], start.hour == 0 and start.minute == 0 and start.second == 0 and start.microsecond == 0
         if (start.hour != 0 or start.minute != 0 or start.second != 0 or start.microsecond != 0
                 or due.hour != 0 or due.minute != 0 or due.second != 0 or due.microsecond != 0):
-            dates['startDate'] = convert_date_to_tick_tick_format(start, tz)
-            dates['dueDate'] = convert_date_to_tick_tick_format(due, tz)
-            dates['allDay'] = False
-            return dates
+            return [start, due], False
         days = monthrange(due.year, due.month)
         if due.day + 1 > days[1]:  # Last day of the month
             if due.month + 1 > 12:  # Last month of the year
@@ -301,10 +690,21 @@ class TaskManager:
             day = due.day + 1
             month = due.month
         due = datetime.datetime(year, month, day)  # No hours, mins, or seconds needed
-        dates['startDate'] = convert_date_to_tick_tick_format(start, tz)
-        dates['dueDate'] = convert_date_to_tick_tick_format(due, tz)
-        dates['allDay'] = True
+        return [start, due], True
+    @staticmethod
+    def _date_fields(converted: list, all_day: bool, tz: str = None) -> dict:
+        dates = {}
+        if tz is not None:
+            dates['timeZone'] = tz
+        dates['startDate'] = converted[0]
+        if len(converted) > 1:
+            dates['dueDate'] = converted[1]
+        dates['allDay'] = all_day
         return dates
+    def dates(self, start, due=None, tz=None):
+        local, all_day = self._local_dates(start, due)
+        converted = convert_dates_to_tick_tick_format(local, tz or self._client.time_zone)
+        return self._date_fields(converted, all_day, tz)
     def builder(self,
                 title: str = '',
                 projectId: str = None,
@@ -344,6 +744,24 @@ class TaskManager:
             dates = self.dates(startDate, dueDate, timeZone)
         # merge dicts
         return {**dates, **task}
+    def builder_many(self, tasks) -> list:
+        # Builds tasks from dicts of builder() arguments. The dates of all tasks sharing a
+        # time zone are converted in one batch, which keeps bulk imports cheap
+        built, pending = [], {}
+        for arguments in tasks:
+            arguments = dict(arguments)
+            start, due = arguments.pop('startDate', None), arguments.pop('dueDate', None)
+            built.append(self.builder(**arguments))
+            if start is not None:
+                tz = arguments.get('timeZone')
+                local, all_day = self._local_dates(start, due)
+                pending.setdefault(tz or self._client.time_zone, []).append((len(built) - 1, local, all_day, tz))
+        for time_zone, entries in pending.items():
+            converted = iter(convert_dates_to_tick_tick_format([date for _, local, _, _ in entries for date in local], time_zone))
+            for position, local, all_day, tz in entries:
+                dates = self._date_fields([next(converted) for _ in local], all_day, tz)
+                built[position] = {**dates, **built[position]}
+        return built
 
 
 def _sort_string_value(sort_type: int) -> str:
@@ -356,6 +774,7 @@ def _sort_string_value(sort_type: int) -> str:
 
 class TagsManager:
     SORT_DICTIONARY = {0: 'project', 1: 'dueDate', 2: 'title', 3: 'priority'}
+    MAX_CONCURRENCY = 8  # Default number of tag requests in flight at once
     def __init__(self, client_class):
         self._client = client_class
         self.access_token = self._client.access_token
@@ -397,7 +816,7 @@ class TagsManager:
                 sort: int = None
                 ) -> dict:
         return self._check_fields(label, color=color, parent_label=parent, sort=sort)
-    def create(self, label, color: str = 'random', parent: str = None, sort: int = None):
+    def _create_objects(self, label, color: str = 'random', parent: str = None, sort: int = None):
         batch = False  # Bool signifying batch create or not
         if isinstance(label, list):
             obj = label  # Assuming all correct objects
@@ -408,27 +827,24 @@ class TagsManager:
             obj = self.builder(label=label, color=color, parent=parent, sort=sort)
         if not batch:
             obj = [obj]
+        return obj, batch
+    def _batch_result(self, response, obj_list: list) -> list:
+        return self._client.reconcile_batch(response, obj_list, 'tags')
+    def create(self, label, color: str = 'random', parent: str = None, sort: int = None):
+        obj, batch = self._create_objects(label, color=color, parent=parent, sort=sort)
         url = self._client.BASE_URL + 'batch/tag'
         payload = {'add': obj}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        if self._client.sync_required(response):
+            self._client.sync()
+        items = self._batch_result(response, obj)
         if not batch:
-            return self._client.get_by_etag(self._client.parse_etag(response), search='tags')
+            return items[0]
+        if len(items) == 1:
+            return items[0]
         else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Tag names are out of order
-            labels = [x['name'] for x in obj]  # Tag names are in order
-            items = [''] * len(obj)  # Create enough spots for the objects
-            for tag in etag2:
-                index = labels.index(tag)  # Object of the index is here
-                actual_etag = etag[tag]  # Get the actual etag
-                found = self._client.get_by_etag(actual_etag, search='tags')
-                items[index] = found  # Place at the correct index
-            if len(items) == 1:
-                return items[0]
-            else:
-                return items
-    def rename(self, old: str, new: str) -> dict:
+            return items
+    def _rename_payload(self, old: str, new: str):
         if not isinstance(old, str) or not isinstance(new, str):
             raise TypeError('Old and New Must Be Strings')
         old = old.lower()
@@ -444,11 +860,14 @@ class TagsManager:
             'name': obj['name'],
             'newName': new
         }
+        return url, payload, temp_new
+    def rename(self, old: str, new: str) -> dict:
+        url, payload, temp_new = self._rename_payload(old, new)
         response = self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
         self._client.sync()
         new_obj = self._client.get_by_fields(name=temp_new, search='tags')
         return self._client.get_by_etag(new_obj['etag'], search='tags')
-    def color(self, label: str, color: str) -> dict:
+    def _color_object(self, label: str, color: str) -> dict:
         if not isinstance(label, str) or not isinstance(color, str):
             raise TypeError('Label and Color Must Be Strings')
         label = label.lower()
@@ -458,14 +877,18 @@ class TagsManager:
         if not check_hex_color(color):
             raise ValueError(f"Hex Color String '{color}' Is Not Valid")
         obj['color'] = color  # Set the color
+        return obj
+    def color(self, label: str, color: str) -> dict:
+        obj = self._color_object(label, color)
         url = self._client.BASE_URL + 'batch/tag'
         payload = {
             'update': [obj]
         }
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        return self._client.get_by_etag(response['id2etag'][obj['name']])
-    def sorting(self, label: str, sort: int) -> dict:
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, [obj])[0]
+    def _sorting_object(self, label: str, sort: int) -> dict:
         if not isinstance(label, str) or not isinstance(sort, int):
             raise TypeError('Label Must Be A String and Sort Must Be An Int')
         label = label.lower()
@@ -474,14 +897,18 @@ class TagsManager:
             raise ValueError(f"Tag '{label}' Does Not Exist To Update")
         sort = self._sort_string_value(sort)  # Get the sort string for the value
         obj['sortType'] = sort  # set the object field
+        return obj
+    def sorting(self, label: str, sort: int) -> dict:
+        obj = self._sorting_object(label, sort)
         url = self._client.BASE_URL + 'batch/tag'
         payload = {
             'update': [obj]
         }
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        return self._client.get_by_etag(response['id2etag'][obj['name']])
-    def nesting(self, child: str, parent: str) -> dict:
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, [obj])[0]
+    def _nesting_objects(self, child: str, parent: str):
         if not isinstance(child, str):
             raise TypeError('Inputs Must Be Strings')
         if parent is not None:
@@ -495,7 +922,7 @@ class TagsManager:
             if obj['parent']:
                 if parent is not None:  # Case 3
                     if obj['parent'] == parent.lower():
-                        return obj
+                        return obj, None
                     else:
                         new_p = parent.lower()
                         obj['parent'] = new_p
@@ -509,18 +936,24 @@ class TagsManager:
                 new_p = parent.lower()  # -> Case 1
                 obj['parent'] = new_p
             else:  # Doesn't want a parent -> Case 2
-                return obj  # We don't have to do anything if no parent and doesn't want a parent
+                return obj, None  # We don't have to do anything if no parent and doesn't want a parent
         pobj = self._client.get_by_fields(name=new_p, search='tags')
         if not pobj:
             raise ValueError(f"Tag '{parent}' Does Not Exist To Set As Parent")
+        return obj, pobj
+    def nesting(self, child: str, parent: str) -> dict:
+        obj, pobj = self._nesting_objects(child, parent)
+        if pobj is None:
+            return obj
         url = self._client.BASE_URL + 'batch/tag'
         payload = {
             'update': [pobj, obj]
         }
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        return self._client.get_by_etag(response['id2etag'][obj['name']], search='tags')
-    def update(self, obj):
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, [pobj, obj])[1]
+    def _update_objects(self, obj):
         batch = False  # Bool signifying batch create or not
         if isinstance(obj, list):
             # Batch tag creation triggered
@@ -531,24 +964,19 @@ class TagsManager:
                 raise TypeError('Required Positional Argument Must Be A Dict or List of Tag Objects')
         if not batch:
             obj_list = [obj]
+        return obj_list, batch
+    def update(self, obj):
+        obj_list, batch = self._update_objects(obj)
         url = self._client.BASE_URL + 'batch/tag'
         payload = {'update': obj_list}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
+        if self._client.sync_required(response):
+            self._client.sync()
+        items = self._batch_result(response, obj_list)
         if not batch:
-            return self._client.get_by_etag(self._client.parse_etag(response), search='tags')
-        else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Tag names are out of order
-            labels = [x['name'] for x in obj_list]  # Tag names are in order
-            items = [''] * len(obj_list)  # Create enough spots for the objects
-            for tag in etag2:
-                index = labels.index(tag)  # Object of the index is here
-                actual_etag = etag[tag]  # Get the actual etag
-                found = self._client.get_by_etag(actual_etag, search='tags')
-                items[index] = found  # Place at the correct index
-            return items
-    def merge(self, label, merged: str):
+            return items[0]
+        return items
+    def _merge_queue(self, label, merged: str):
         if not isinstance(merged, str):
             raise ValueError('Merged Must Be A String')
         if not isinstance(label, str) and not isinstance(label, list):
@@ -573,19 +1001,74 @@ class TagsManager:
                 if not found:
                     raise ValueError(f"Tag '{item}' Does Not Exist To Merge")
                 merge_queue.append(found)
-        for labels in merge_queue:
-            url = self._client.BASE_URL + 'tag/merge'
-            payload = {
-                'name': labels['name'],
-                'newName': kept_obj['name']
+        return kept_obj, merge_queue
+    def _send_concurrently(self, method, url: str, pending: dict, max_concurrency: int = None) -> dict:
+        # pending maps a tag name to the keyword arguments of its request, the failures are returned by name
+        failed = {}
+        if not pending:
+            return failed
+        with ThreadPoolExecutor(max_workers=max_concurrency or self.MAX_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(method, url, cookies=self._client.cookies, headers=self.headers, **kwargs): name
+                for name, kwargs in pending.items()
             }
-            self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed[futures[future]] = e
+        return failed
+    @staticmethod
+    def _raise_failures(failed: dict, action: str) -> None:
+        if failed:
+            raise RuntimeError(f"Could Not {action} Tags: {', '.join(sorted(failed))}")
+    @staticmethod
+    def _merge_request(tag: dict, kept_obj: dict) -> dict:
+        return {'json': {'name': tag['name'], 'newName': kept_obj['name']}}
+    def _merge_requests(self, merge_queue: list, kept_obj: dict) -> dict:
+        return {tag['name']: self._merge_request(tag, kept_obj) for tag in merge_queue}
+    def _bulk_requests(self, labels, build_request, error_message: str):
+        if isinstance(labels, str):
+            labels = [labels]
+        pending, failed = {}, {}
+        for label in labels:
+            name = label.lower() if isinstance(label, str) else label
+            tag_obj = self._client.state['tags'].get(name)
+            if tag_obj is None:
+                failed[name] = ValueError(error_message.format(label))
+            else:
+                pending[name] = build_request(tag_obj)
+        return pending, failed
+    @staticmethod
+    def _bulk_result(pending: dict, failed: dict) -> dict:
+        return {'succeeded': [name for name in pending if name not in failed], 'failed': failed}
+    def merge(self, label, merged: str):
+        kept_obj, merge_queue = self._merge_queue(label, merged)
+        url = self._client.BASE_URL + 'tag/merge'
+        failed = self._send_concurrently(self._client.http_put, url, self._merge_requests(merge_queue, kept_obj))
         self._client.sync()
+        self._raise_failures(failed, 'Merge')
         return kept_obj
-    def delete(self, label):
+    def _kept_tag(self, merged: str) -> dict:
+        if not isinstance(merged, str):
+            raise ValueError('Merged Must Be A String')
+        kept_obj = self._client.state['tags'].get(merged.lower())
+        if kept_obj is None:
+            raise ValueError(f"Kept Tag '{merged}' Does Not Exist To Merge")
+        return kept_obj
+    def _bulk_merge_requests(self, labels, merged: str):
+        kept_obj = self._kept_tag(merged)
+        pending, failed = self._bulk_requests(
+            labels, lambda tag: self._merge_request(tag, kept_obj), "Tag '{}' Does Not Exist To Merge")
+        return self._client.BASE_URL + 'tag/merge', pending, failed
+    def bulk_merge(self, labels, merged: str, max_concurrency: int = None) -> dict:
+        url, pending, failed = self._bulk_merge_requests(labels, merged)
+        failed.update(self._send_concurrently(self._client.http_put, url, pending, max_concurrency))
+        self._client.sync()
+        return self._bulk_result(pending, failed)
+    def _delete_objects(self, label) -> list:
         if not isinstance(label, str) and not isinstance(label, list):
             raise TypeError('Label Must Be A String or List Of Strings')
-        url = self._client.BASE_URL + 'tag'
         if isinstance(label, str):
             label = [label]  # If a singular string we are going to add it to a list
         objects = []
@@ -596,16 +1079,43 @@ class TagsManager:
             tag_obj = self._client.get_by_fields(name=lbl, search='tags')  # Get the tag object
             if not tag_obj:
                 raise ValueError(f"Tag '{lbl}' Does Not Exist To Delete")
-            params = {
-                'name': tag_obj['name']
-            }
-            response = self._client.http_delete(url, params=params, cookies=self._client.cookies, headers=self.headers)
-            objects.append(self._client.delete_from_local_state(search='tags', etag=tag_obj['etag']))
-        self._client.sync()
+            objects.append(tag_obj)
+        return objects
+    def _delete_local(self, names: list) -> list:
+        return [self._client.state['tags'].remove(name) for name in names]
+    @staticmethod
+    def _delete_request(tag: dict) -> dict:
+        return {'params': {'name': tag['name']}}
+    def _delete_requests(self, label):
+        pending = {tag_obj['name']: self._delete_request(tag_obj) for tag_obj in self._delete_objects(label)}
+        return self._client.BASE_URL + 'tag', pending
+    def _after_delete(self, pending: dict, failed: dict) -> list:
+        return self._delete_local([name for name in pending if name not in failed])
+    def _deleted_result(self, objects: list, failed: dict):
+        self._raise_failures(failed, 'Delete')
         if len(objects) == 1:
             return objects[0]
         else:
             return objects
+    def delete(self, label):
+        url, pending = self._delete_requests(label)
+        failed = self._send_concurrently(self._client.http_delete, url, pending)
+        objects = self._after_delete(pending, failed)
+        self._client.sync()
+        return self._deleted_result(objects, failed)
+    def _bulk_delete_requests(self, labels):
+        pending, failed = self._bulk_requests(labels, self._delete_request, "Tag '{}' Does Not Exist To Delete")
+        return self._client.BASE_URL + 'tag', pending, failed
+    def _after_bulk_delete(self, pending: dict, failed: dict) -> dict:
+        result = self._bulk_result(pending, failed)
+        self._delete_local(result['succeeded'])
+        return result
+    def bulk_delete(self, labels, max_concurrency: int = None) -> dict:
+        url, pending, failed = self._bulk_delete_requests(labels)
+        failed.update(self._send_concurrently(self._client.http_delete, url, pending, max_concurrency))
+        result = self._after_bulk_delete(pending, failed)
+        self._client.sync()
+        return result
 
 class SettingsManager:
     def __init__(self, client_class):
@@ -667,77 +1177,58 @@ class ProjectManager:
             if not check_hex_color(color):
                 raise ValueError('Invalid Hex Color String')
         return {'name': name, 'color': color, 'kind': project_type, 'groupId': folder_id}
-    def create(self, name, color: str = 'random', project_type: str = 'TASK', folder_id: str = None):
+    def _create_objects(self, name, color: str = 'random', project_type: str = 'TASK', folder_id: str = None) -> list:
         if isinstance(name, list):
             obj = name
-            batch = True
         elif isinstance(name, str):
-            batch = False
             obj = self.builder(name=name, color=color, project_type=project_type, folder_id=folder_id)
             obj = [obj]
         else:
             raise TypeError(f"Required Positional Argument Must Be A String or List of Project Objects")
+        for project in obj:
+            project.setdefault('id', secrets.token_hex(12))  # Ids of new projects are generated by the client
+        return obj
+    def _batch_result(self, response, objs: list, search: str):
+        items = self._client.reconcile_batch(response, objs, search)
+        if len(items) == 1:
+            return items[0]
+        return items
+    def create(self, name, color: str = 'random', project_type: str = 'TASK', folder_id: str = None):
+        obj = self._create_objects(name, color=color, project_type=project_type, folder_id=folder_id)
         url = self._client.BASE_URL + 'batch/project'
         payload = {'add': obj}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        if len(obj) == 1:
-            return self._client.get_by_id(self._client.parse_id(response), search='projects')
-        else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(obj)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='projects')
-                for original in obj:
-                    if found['name'] == original['name']:
-                        # Get the index of original
-                        index = obj.index(original)
-                        # Place found at the index in return list
-                        items[index] = found
-            return items
-    def update(self, obj):
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, obj, 'projects')
+    @staticmethod
+    def _update_objects(obj) -> list:
         if not isinstance(obj, dict) and not isinstance(obj, list):
             raise TypeError("Project objects must be a dict or list of dicts.")
         if isinstance(obj, dict):
             tasks = [obj]
         else:
             tasks = obj
+        return tasks
+    def update(self, obj):
+        tasks = self._update_objects(obj)
         url = self._client.BASE_URL + 'batch/project'
         payload = {'update': tasks}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        if len(tasks) == 1:
-            return self._client.get_by_id(self._client.parse_id(response), search='projects')
-        else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(obj)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='projects')
-                for original in obj:
-                    if found['name'] == original['name']:
-                        index = obj.index(original)
-                        items[index] = found
-            return items
-    def delete(self, ids):
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, tasks, 'projects')
+    def _existing_ids(self, ids, search: str, error_message: str) -> list:
         if not isinstance(ids, str) and not isinstance(ids, list):
             raise TypeError('Ids Must Be A String or List Of Strings')
         if isinstance(ids, str):
-            proj = self._client.get_by_fields(id=ids, search='projects')
-            if not proj:
-                raise ValueError(f"Project '{ids}' Does Not Exist To Delete")
             ids = [ids]
-        else:
-            for i in ids:
-                proj = self._client.get_by_fields(id=i, search='projects')
-                if not proj:
-                    raise ValueError(f"Project '{i}' Does Not Exist To Delete")
-        url = self._client.BASE_URL + 'batch/project'
-        payload = {
-            'delete': ids
-        }
-        self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        for i in ids:
+            proj = self._client.get_by_fields(id=i, search=search)
+            if not proj:
+                raise ValueError(error_message.format(i))
+        return ids
+    def _delete_local(self, ids: list):
         deleted_list = []
         for current_id in ids:
             tasks = self._client.task.get_from_project(current_id)
@@ -748,99 +1239,68 @@ class ProjectManager:
             return deleted_list[0]
         else:
             return deleted_list
-    def archive(self, ids):
-        if not isinstance(ids, str) and not isinstance(ids, list):
-            raise TypeError('Ids Must Be A String or List Of Strings')
+    def delete(self, ids):
+        ids = self._existing_ids(ids, 'projects', "Project '{}' Does Not Exist To Delete")
+        url = self._client.BASE_URL + 'batch/project'
+        payload = {
+            'delete': ids
+        }
+        self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        return self._delete_local(ids)
+    def _archive_objects(self, ids) -> list:
+        ids = self._existing_ids(ids, 'projects', "Project '{}' Does Not Exist To Archive")
         objs = []
-        if isinstance(ids, str):
-            proj = self._client.get_by_fields(id=ids, search='projects')
-            if not proj:
-                raise ValueError(f"Project '{ids}' Does Not Exist To Archive")
+        for i in ids:
+            proj = self._client.get_by_fields(id=i, search='projects')
             proj['closed'] = True
-            objs = [proj]
-        else:
-            for i in ids:
-                proj = self._client.get_by_fields(id=i, search='projects')
-                if not proj:
-                    raise ValueError(f"Project '{i}' Does Not Exist To Archive")
-                proj['closed'] = True
-                objs.append(proj)
-        return self.update(objs)
-    def create_folder(self, name):
+            objs.append(proj)
+        return objs
+    def archive(self, ids):
+        return self.update(self._archive_objects(ids))
+    @staticmethod
+    def _folder_objects(name) -> list:
         if not isinstance(name, str) and not isinstance(name, list):
             raise TypeError('Name Must Be A String or List Of Strings')
         objs = []
         if isinstance(name, str):
-            names = {'name': name,'listType': 'group'}
+            names = {'id': secrets.token_hex(12), 'name': name,'listType': 'group'}
             objs = [names]
         else:
             for nm in name:
-                objs.append({'name': nm,'listType': 'group'})
+                objs.append({'id': secrets.token_hex(12), 'name': nm,'listType': 'group'})
+        return objs
+    def create_folder(self, name):
+        objs = self._folder_objects(name)
         url = self._client.BASE_URL + 'batch/projectGroup'
         payload = {'add': objs}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        if len(objs) == 1:
-            return self._client.get_by_id(self._client.parse_id(response), search='project_folders')
-        else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(objs)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='project_folders')
-                for original in objs:
-                    if found['name'] == original['name']:
-                        index = objs.index(original)
-                        items[index] = found
-            return items
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, objs, 'project_folders')
     def update_folder(self, obj):
-        if not isinstance(obj, dict) and not isinstance(obj, list):
-            raise TypeError("Project objects must be a dict or list of dicts.")
-        if isinstance(obj, dict):
-            tasks = [obj]
-        else:
-            tasks = obj
+        tasks = self._update_objects(obj)
         url = self._client.BASE_URL + 'batch/projectGroup'
         payload = {'update': tasks}
         response = self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
-        self._client.sync()
-        if len(tasks) == 1:
-            return self._client.get_by_id(self._client.parse_id(response), search='project_folders')
-        else:
-            etag = response['id2etag']
-            etag2 = list(etag.keys())  # Get the ids
-            items = [''] * len(tasks)  # Create enough spots for the objects
-            for proj_id in etag2:
-                found = self._client.get_by_id(proj_id, search='project_folders')
-                for original in tasks:
-                    if found['name'] == original['name']:
-                        index = tasks.index(original)
-                        items[index] = found
-            return items
-    def delete_folder(self, ids):
-        if not isinstance(ids, str) and not isinstance(ids, list):
-            raise TypeError('Ids Must Be A String or List Of Strings')
-        if isinstance(ids, str):
-            proj = self._client.get_by_fields(id=ids, search='project_folders')
-            if not proj:
-                raise ValueError(f"Project Folder '{ids}' Does Not Exist To Delete")
-            ids = [ids]
-        else:
-            for i in ids:
-                proj = self._client.get_by_fields(id=i, search='project_folders')
-                if not proj:
-                    raise ValueError(f"Project Folder '{i}' Does Not Exist To Delete")
-        url = self._client.BASE_URL + 'batch/projectGroup'
-        payload = {'delete': ids}
-        self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            self._client.sync()
+        return self._batch_result(response, tasks, 'project_folders')
+    def _deleted_folders(self, ids: list):
         deleted_list = []
         for current_id in ids:
             deleted_list.append(self._client.get_by_id(current_id, search='project_folders'))
-        self._client.sync()
         if len(deleted_list) == 1:
             return deleted_list[0]
         else:
             return deleted_list
+    def delete_folder(self, ids):
+        ids = self._existing_ids(ids, 'project_folders', "Project Folder '{}' Does Not Exist To Delete")
+        url = self._client.BASE_URL + 'batch/projectGroup'
+        payload = {'delete': ids}
+        self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        deleted = self._deleted_folders(ids)
+        self._client.sync()
+        return deleted
 
 class FocusTimeManager:
     def __init__(self, client_class):
@@ -871,35 +1331,92 @@ class PomoManager:
 class TickTickClient:
     BASE_URL = 'https://api.ticktick.com/api/v2/'
     OPEN_API_BASE_URL = 'https://api.ticktick.com'
-    INITIAL_BATCH_URL = BASE_URL + 'batch/check/0'
+    BATCH_CHECK_URL = BASE_URL + 'batch/check/'
+    INITIAL_BATCH_URL = BATCH_CHECK_URL + '0'
     USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:123.0) Gecko/20100101 Firefox/123.0"
     X_DEVICE_ = '{"platform":"web","os":"OS X","device":"Firefox 123.0","name":"unofficial api!","version":4531,' \
                 '"id":"6490' + secrets.token_hex(10) + '","channel":"website","campaign":"","websocket":""}'
     HEADERS = {'User-Agent': USER_AGENT,'x-device': X_DEVICE_}
-    def __init__(self, username: str, password: str, oauth: OAuth2) -> None:
+    FULL_SYNC_INTERVAL = 6 * 60 * 60  # Seconds between full snapshots when syncing incrementally
+    # Manager classes, AsyncTickTickClient swaps in the ones whose requests are coroutines
+    PROJECT_MANAGER = ProjectManager
+    TAGS_MANAGER = TagsManager
+    TASK_MANAGER = TaskManager
+    def __init__(self, username: str, password: str, oauth: OAuth2, incremental_sync: bool = False, sync_on_write: bool = True,
+                 stream_sync: bool = False, task_fields=None) -> None:
+        self._init_state(oauth, oauth.session, incremental_sync, sync_on_write, stream_sync, task_fields)
+        self.metrics.attach(self._session)
+        self._prepare_session(username, password)
+        self._init_managers()
+    def _init_state(self, oauth: OAuth2, session, incremental_sync: bool, sync_on_write: bool, stream_sync: bool, task_fields) -> None:
+        # Shared by both clients, so every field exists in each of them
         self.access_token = None
         self.cookies = {}
         self.time_zone = ''
         self.profile_id = ''
         self.inbox_id = ''
         self.state = {}
+        self.checkpoint = 0
+        # When enabled, sync() only requests the changes since the last checkpoint
+        self.incremental_sync = incremental_sync
+        # When disabled, task writes are applied to self.state from the server response instead of a full sync
+        self.sync_on_write = sync_on_write
+        # When enabled (and ijson is installed), sync responses are decoded incrementally from the socket
+        self.stream_sync = stream_sync and streaming_available()
+        # Only these task fields are kept from sync responses, None keeps all of them
+        self.task_fields = frozenset(task_fields) if task_fields is not None else None
+        # Per-endpoint request counts, latencies, sizes, retries and sync phase timings
+        self.metrics = ClientMetrics()
         self.reset_local_state()
         self.oauth_manager = oauth
-        self._session = self.oauth_manager.session
-        self._prepare_session(username, password)
+        self._session = session
+    def _init_managers(self) -> None:
         self.focus = FocusTimeManager(self)
         self.habit = HabitManager(self)
-        self.project = ProjectManager(self)
+        self.project = self.PROJECT_MANAGER(self)
         self.pomo = PomoManager(self)
         self.settings = SettingsManager(self)
-        self.tag = TagsManager(self)
-        self.task = TaskManager(self)
+        self.tag = self.TAGS_MANAGER(self)
+        self.task = self.TASK_MANAGER(self)
     def _prepare_session(self, username, password):
         self._login(username, password)
         self._settings()
         self.sync()
     def reset_local_state(self):
-        self.state = {'projects': [], 'project_folders': [], 'tags': [],'tasks': [],'user_settings': {},'profile': {}}
+        self.state = {
+            'projects': IndexedCollection(),
+            'project_folders': IndexedCollection(),
+            'tags': IndexedCollection(key='name'),
+            'tasks': IndexedCollection(indexes=('projectId', 'parentId', 'status'), multi_indexes=('tags',), record=TaskRecord),
+            'user_settings': {},
+            'profile': {}
+        }
+        self.checkpoint = 0  # Forces the next sync to download a full snapshot
+        self.last_full_sync = 0.0  # Wall time of the last full snapshot
+    def dump_snapshot(self) -> dict:
+        return {
+            'checkpoint': self.checkpoint,
+            'last_full_sync': self.last_full_sync,
+            'inbox_id': self.inbox_id,
+            'time_zone': self.time_zone,
+            'profile_id': self.profile_id,
+            'state': {name: [as_dict(obj) for obj in items] for name, items in self.state.items() if isinstance(items, IndexedCollection)}
+        }
+    def load_snapshot(self, snapshot: dict) -> None:
+        self.reset_local_state()
+        try:
+            for name, items in snapshot['state'].items():
+                if isinstance(self.state.get(name), IndexedCollection):
+                    self.state[name].replace(items)
+            self.inbox_id = snapshot['inbox_id']
+            # Settings loaded from the server are newer than the snapshot's
+            self.time_zone = self.time_zone or snapshot['time_zone']
+            self.profile_id = self.profile_id or snapshot['profile_id']
+            self.checkpoint = snapshot['checkpoint']
+            self.last_full_sync = snapshot.get('last_full_sync', 0.0)
+        except (KeyError, TypeError, AttributeError) as e:
+            self.reset_local_state()
+            raise ValueError('Invalid State Snapshot') from e
     def _login(self, username: str, password: str) -> None:
         url = self.BASE_URL + 'user/signon?wc=true&remember=true'
         user_info = {'username': username, 'password': password}
@@ -909,6 +1426,8 @@ class TickTickClient:
         self.cookies['t'] = self.access_token
     @staticmethod
     def check_status_code(response, error_message: str) -> None:
+        if response.status_code == 429:
+            raise RateLimitError(error_message, parse_retry_after(response.headers.get('Retry-After')))
         if response.status_code != 200:
             raise RuntimeError(error_message)
     def _settings(self):
@@ -918,42 +1437,106 @@ class TickTickClient:
         self.time_zone = response['timeZone']
         self.profile_id = response['id']
         return response
-    def sync(self):
-        response = self.http_get(self.INITIAL_BATCH_URL, cookies=self.cookies, headers=self.HEADERS)
+    def _sync_url(self, full: bool = False) -> str:
+        # Deltas are only merged, so a full snapshot is taken now and then to drop whatever drifted
+        if (full or not self.incremental_sync or not self.checkpoint
+                or time.time() - self.last_full_sync >= self.FULL_SYNC_INTERVAL):
+            return self.INITIAL_BATCH_URL
+        return self.BATCH_CHECK_URL + str(self.checkpoint)
+    def _apply_sync(self, url: str, response: dict) -> None:
+        if url == self.INITIAL_BATCH_URL:
+            self._apply_full_sync(response)
+        else:
+            self._apply_delta_sync(response)
+        self.checkpoint = response.get('checkPoint') or self.checkpoint
+    def _streamed_tasks(self, url: str):
+        # A full snapshot is indexed into a new collection while it streams in, _apply_full_sync swaps it in
+        return self.state['tasks'].empty_copy() if url == self.INITIAL_BATCH_URL else None
+    def _fetch_sync(self, url: str):
+        if not self.stream_sync:
+            with self.metrics.timed('http'):
+                response = self._send('GET', url, cookies=self.cookies, headers=self.HEADERS)
+            with self.metrics.timed('decode'):
+                return filter_task_fields(self._decode(response), self.task_fields)
+        with self.metrics.request('GET', url) as record:
+            with self.metrics.timed('http'):
+                response = self._session.get(url, stream=True, cookies=self.cookies, headers=self.HEADERS)
+            with response:
+                record.received()
+                self.check_status_code(response, 'Could Not Complete Request')
+                response.raw.decode_content = True  # Let urllib3 undo any gzip encoding
+                reader = CountingReader(response.raw)
+                with self.metrics.timed('decode'):
+                    payload = decode_sync_payload(reader, self.task_fields, self._streamed_tasks(url))
+                record.size = reader.bytes_read
+        return payload
+    def sync(self, full: bool = False):
+        url = self._sync_url(full)
+        with self.metrics.sync():
+            try:
+                response = self._fetch_sync(url)
+            except RateLimitError:
+                raise
+            except RuntimeError:
+                if url == self.INITIAL_BATCH_URL:
+                    raise
+                # The server rejected the checkpoint, start over from a full snapshot
+                url = self.INITIAL_BATCH_URL
+                response = self._fetch_sync(url)
+            with self.metrics.timed('state'):
+                self._apply_sync(url, response)
+        return response
+    def _apply_full_sync(self, response: dict) -> None:
         self.inbox_id = response['inboxId']
-        self.state['project_folders'] = response['projectGroups']
-        self.state['projects'] = response['projectProfiles']
-        self.state['tasks'] = response['syncTaskBean']['update']
-        self.state['tags'] = response['tags']
+        self.state['project_folders'].replace(response['projectGroups'])
+        self.state['projects'].replace(response['projectProfiles'])
+        tasks = response['syncTaskBean']['update']
+        if isinstance(tasks, IndexedCollection):
+            self.state['tasks'] = tasks  # Already indexed while the snapshot was streamed
+        else:
+            self.state['tasks'].replace(tasks)
+        self.state['tags'].replace(response['tags'])
+        self.last_full_sync = time.time()
+    def _apply_delta_sync(self, response: dict) -> None:
+        if response.get('inboxId'):
+            self.inbox_id = response['inboxId']
+        # Projects, folders and tags are only sent when they changed, and then as a complete list
+        if response.get('projectGroups') is not None:
+            self.state['project_folders'].replace(response['projectGroups'])
+        if response.get('projectProfiles') is not None:
+            self.state['projects'].replace(response['projectProfiles'])
+        if response.get('tags') is not None:
+            self.state['tags'].replace(response['tags'])
+        task_bean = response.get('syncTaskBean') or {}
+        for task in task_bean.get('update') or []:
+            if task.get('status', 0) != 0:
+                # Tasks completed (2) or abandoned (-1) elsewhere, a full snapshot never contains them
+                self.state['tasks'].remove(task['id'])
+            else:
+                self.state['tasks'].upsert(task)
+        for item in task_bean.get('delete') or []:
+            self.state['tasks'].remove(item['taskId'])
+    def _send(self, method: str, url: str, **kwargs):
+        # Sends a request and checks its status, recording it in self.metrics
+        with self.metrics.request(method, url) as record:
+            response = self._session.request(method, url, **kwargs)
+            record.received(len(response.content))
+            self.check_status_code(response, 'Could Not Complete Request')
         return response
-    def http_post(self, url, **kwargs):
-        response = self._session.post(url, **kwargs)
-        self.check_status_code(response, 'Could Not Complete Request')
+    @staticmethod
+    def _decode(response):
         try:
             return response.json()
         except ValueError:
             return response.text
+    def http_post(self, url, **kwargs):
+        return self._decode(self._send('POST', url, **kwargs))
     def http_get(self, url, **kwargs):
-        response = self._session.get(url, **kwargs)
-        self.check_status_code(response, 'Could Not Complete Request')
-        try:
-            return response.json()
-        except ValueError:
-            return response.text
+        return self._decode(self._send('GET', url, **kwargs))
     def http_delete(self, url, **kwargs):
-        response = self._session.delete(url, **kwargs)
-        self.check_status_code(response, 'Could Not Complete Request')
-        try:
-            return response.json()
-        except ValueError:
-            return response.text
+        return self._decode(self._send('DELETE', url, **kwargs))
     def http_put(self, url, **kwargs):
-        response = self._session.put(url, **kwargs)
-        self.check_status_code(response, 'Could Not Complete Request')
-        try:
-            return response.json()
-        except ValueError:
-            return response.text
+        return self._decode(self._send('PUT', url, **kwargs))
     @staticmethod
     def parse_id(response: dict) -> str:
         id_tag = response['id2etag']
@@ -970,164 +1553,585 @@ class TickTickClient:
             for key in range(len(etag2)):
                 etags.append(etag[etag2[key]])
             return etags
+    def sync_required(self, response) -> bool:
+        # Writes are applied to the local state unless syncing is forced or the server rejected part of them
+        return self.sync_on_write or (isinstance(response, dict) and bool(response.get('id2error')))
+    def reconcile_batch(self, response: dict, objs: list, search: str) -> list:
+        # Store the sent objects under the etags returned for them, keeping the order they were sent in
+        collection = self.state[search]
+        id2etag = response.get('id2etag') or {}
+        items = []
+        for obj in objs:
+            key = obj.get(collection.key)
+            etag = id2etag.get(key)
+            current = collection.get(key)
+            if etag is None or (current is not None and current.get('etag') == etag):
+                items.append(current or {})  # Not saved, or already synced
+                continue
+            if current is not None and current is not obj:
+                current.update(obj)
+                obj = current
+            obj['etag'] = etag
+            items.append(collection.upsert(obj))
+        return items
+    def _collections(self, search: str = None, key: str = None) -> list:
+        # Without search every collection is visited, or only those keyed by key when given
+        if search is not None:
+            if search not in self.state:
+                raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
+            return [self.state[search]]
+        return [collection for collection in self.state.values()
+                if isinstance(collection, IndexedCollection) and (key is None or collection.key == key)]
     def get_by_fields(self, search: str = None, **kwargs):
         if kwargs == {}:
             raise ValueError('Must Include Field(s) To Be Searched For')
-        if search is not None and search not in self.state:
-            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
         objects = []
-        if search is not None:
-            for index in self.state[search]:
-                all_match = True
-                for field in kwargs:
-                    if kwargs[field] != index[field]:
-                        all_match = False
-                        break
-                if all_match:
-                    objects.append(index)
-        else:
-            for primarykey in self.state:
-                skip_primary_key = False
-                all_match = True
-                middle_key = 0
-                for middle_key in range(len(self.state[primarykey])):
-                    if skip_primary_key:
-                        break
-                    for fields in kwargs:
-                        if fields not in self.state[primarykey][middle_key]:
-                            all_match = False
-                            skip_primary_key = True
-                            break
-                        if kwargs[fields] == self.state[primarykey][middle_key][fields]:
-                            all_match = True
-                        else:
-                            all_match = False
-                    if all_match:
-                        objects.append(self.state[primarykey][middle_key])
+        for collection in self._collections(search):
+            objects.extend(collection.find(**kwargs))
         if len(objects) == 1:
             return objects[0]
         else:
             return objects
     def get_by_id(self, obj_id: str, search: str = None) -> dict:
-        if search is not None and search not in self.state:
-            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
-        if search is not None:
-            for index in self.state[search]:
-                if index['id'] == obj_id:
-                    return index
-        else:
-            for prim_key in self.state:
-                for our_object in self.state[prim_key]:
-                    if 'id' not in our_object:
-                        break
-                    if our_object['id'] == obj_id:
-                        return our_object
+        # Collections keyed by something else (tags) are only scanned when searched explicitly
+        for collection in self._collections(search, key='id'):
+            if collection.key == 'id':
+                found = collection.get(obj_id)
+            else:
+                found = next(iter(collection.find(id=obj_id)), None)
+            if found is not None:
+                return found
         return {}
     def get_by_etag(self, etag: str, search: str = None) -> dict:
-        if search is not None and search not in self.state:
-            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
-        if search is not None:
-            for index in self.state[search]:
-                if index['etag'] == etag:
-                    return index
-        else:
-            for prim_key in self.state:
-                for our_object in self.state[prim_key]:
-                    if 'etag' not in our_object:
-                        break
-                    if our_object['etag'] == etag:
-                        return our_object
+        for collection in self._collections(search):
+            found = collection.get_by_etag(etag)
+            if found is not None:
+                return found
         return {}
     def delete_from_local_state(self, search: str = None, **kwargs) -> dict:
         if kwargs == {}:
             raise ValueError('Must Include Field(s) To Be Searched For')
-        if search is not None and search not in self.state:
-            raise KeyError(f"'{search}' Is Not Present In self.state Dictionary")
-        if search is not None:
-            for item in range(len(self.state[search])):
-                all_match = True
-                for field in kwargs:
-                    if kwargs[field] != self.state[search][item][field]:
-                        all_match = False
-                        break
-                if all_match:
-                    deleted = self.state[search][item]
-                    del self.state[search][item]
-                    return deleted
+        for collection in self._collections(search):
+            found = collection.find(**kwargs)
+            if found:
+                return collection.remove(found[0][collection.key])
+
+class AsyncTaskManager(TaskManager):
+    # Only the requests differ from TaskManager, the responses are handled by its _after_* helpers.
+    # create_many, update_many, move_many and reparent are inherited and return the coroutine of
+    # _save_many or _post_chunks.
+    async def create(self, task):
+        url = self._generate_create_url()
+        response = await self._client.http_post(url=url, json=as_dict(task), headers=self.oauth_headers)
+        if self._after_save(response):
+            await self._client.sync()
+        return response
+    async def update(self, task):
+        url = self._generate_update_url(task['id'])
+        response = await self._client.http_post(url=url, json=as_dict(task), headers=self.oauth_headers)
+        if self._after_save(response):
+            await self._client.sync()
+        return response
+    async def complete(self, task: dict):
+        url = self._generate_mark_complete_url(task['projectId'], task['id'])
+        response = await self._client.http_post(url=url, json=as_dict(task), headers=self.oauth_headers)
+        if self._after_complete(task):
+            await self._client.sync()
+        if response == '':
+            return task
+        return response
+    async def delete(self, task):
+        url = self._generate_delete_url()
+        to_delete = self._delete_payload(task)
+        payload = {'delete': to_delete}
+        await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._after_delete(to_delete):
+            await self._client.sync()
+        return task
+    async def make_subtask(self, obj, parent: str):
+        if not isinstance(parent, str):
+            raise TypeError('parent must be a string')
+        tasks = await self.reparent(obj, parent)
+        if len(tasks) == 1:
+            return tasks[0]  # Return just the dictionary object if its a single task
+        return tasks
+    async def move(self, obj, new: str):
+        move_tasks = self._move_payload(obj, new)
+        url = self._client.BASE_URL + 'batch/taskProject'
+        response = await self._client.http_post(url, json=move_tasks, cookies=self._client.cookies, headers=self.headers)
+        if self._after_patch(response, [task['taskId'] for task in move_tasks], projectId=new):
+            await self._client.sync()
+        return self._local_tasks([x['taskId'] for x in move_tasks])
+    async def move_all(self, old: str, new: str) -> list:
+        tasks, task_project = self._move_all_payload(old, new)
+        if not tasks:
+            return tasks  # No tasks to move so just return the empty list
+        url = self._client.BASE_URL + 'batch/taskProject'
+        response = await self._client.http_post(url, json=task_project, cookies=self._client.cookies, headers=self.headers)
+        if self._after_patch(response, [task['id'] for task in tasks], projectId=new):
+            await self._client.sync()
+        return self._client.task.get_from_project(new)
+    async def _send_chunks(self, url: str, chunks: list, max_concurrency: int = None):
+        semaphore = asyncio.Semaphore(max_concurrency or self.MAX_CONCURRENCY)
+        async def send(chunk):
+            async with semaphore:
+                return await self._client.http_post(url, json=chunk, cookies=self._client.cookies, headers=self.headers)
+        results = await asyncio.gather(*(send(chunk) for chunk in chunks), return_exceptions=True)
+        responses = [None if isinstance(result, Exception) else result for result in results]
+        return responses, next((result for result in results if isinstance(result, Exception)), None)
+    async def _post_chunks(self, url: str, payload: list, chunk_size: int = None, max_concurrency: int = None, **fields) -> list:
+        if not payload:
+            return []
+        chunks = self._batch_chunks(payload, chunk_size)
+        responses, failure = await self._send_chunks(url, chunks, max_concurrency)
+        errors = self._apply_chunk_responses(chunks, responses, **fields)
+        if self._client.sync_on_write or errors:
+            await self._client.sync()
+        return self._after_chunks(payload, errors, failure)
+    async def _save_many(self, action: str, tasks: list, chunk_size: int = None) -> list:
+        url = self._generate_batch_url()
+        errors = {}
+        for chunk in self._batch_chunks(tasks, chunk_size):
+            response = await self._client.http_post(url, json=self._save_payload(action, chunk), cookies=self._client.cookies, headers=self.headers)
+            self._apply_batch_response(chunk, response, errors)
+        if self._client.sync_required({'id2error': errors}):
+            await self._client.sync()
+        self._check_batch_errors(errors)
+        return tasks
+    async def _iter_completed_window(self, start, end):
+        url = self._client.BASE_URL + 'project/all/completed'
+        cursor, seen = end, set()
+        while cursor is not None:
+            parameters = self._completed_parameters(start, cursor)
+            page = await self._client.http_get(url, params=parameters, cookies=self._client.cookies, headers=self.headers)
+            tasks, cursor, seen = self._next_completed_page(page or [], seen)
+            for task in tasks:
+                yield task
+    async def _completed_window(self, start, end, semaphore: asyncio.Semaphore) -> list:
+        async with semaphore:
+            return [task async for task in self._iter_completed_window(start, end)]
+    async def iter_completed(self, start, end=None, full: bool = True, tz: str = None,
+                             window: datetime.timedelta = None, max_workers: int = 4):
+        windows = self._completed_plan(start, end, full, tz, window)
+        if len(windows) == 1 or max_workers <= 1:
+            for window_start, window_end in windows:
+                async for task in self._iter_completed_window(window_start, window_end):
+                    yield task
+            return
+        semaphore = asyncio.Semaphore(max_workers)
+        pending = [asyncio.ensure_future(self._completed_window(*r, semaphore)) for r in windows]
+        try:
+            for future in asyncio.as_completed(pending):
+                for task in await future:
+                    yield task
+        finally:
+            for future in pending:
+                future.cancel()
+    async def get_completed(self, start, end=None, full: bool = True, tz: str = None) -> list:
+        return [task async for task in self.iter_completed(start, end, full=full, tz=tz)]
+
+
+class AsyncTagsManager(TagsManager):
+    async def create(self, label, color: str = 'random', parent: str = None, sort: int = None):
+        obj, batch = self._create_objects(label, color=color, parent=parent, sort=sort)
+        url = self._client.BASE_URL + 'batch/tag'
+        payload = {'add': obj}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        items = self._batch_result(response, obj)
+        if not batch:
+            return items[0]
+        if len(items) == 1:
+            return items[0]
         else:
-            for primary_key in self.state:
-                skip_primary_key = False
-                all_match = True
-                middle_key = 0
-                for middle_key in range(len(self.state[primary_key])):
-                    if skip_primary_key:
-                        break
-                    for fields in kwargs:
-                        if fields not in self.state[primary_key][middle_key]:
-                            all_match = False
-                            skip_primary_key = True
-                            break
-                        if kwargs[fields] == self.state[primary_key][middle_key][fields]:
-                            all_match = True
-                        else:
-                            all_match = False
-                    if all_match:
-                        deleted = self.state[primary_key][middle_key]
-                        del self.state[primary_key][middle_key]
-                        return deleted
-
-# def _create_ticktick_client(email, password, client_id, client_secret, access_token):
-def _create_ticktick_client(client_id, client_secret, access_token):
-    auth_client = OAuth2(client_id=client_id, client_secret=client_secret, redirect_uri="http://127.0.0.1:8080", access_token=access_token)
-    ticktick_client = TickTickClient(auth_client)
-    # ticktick_client.sync()
-    return ticktick_client
+            return items
+    async def rename(self, old: str, new: str) -> dict:
+        url, payload, temp_new = self._rename_payload(old, new)
+        await self._client.http_put(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        await self._client.sync()
+        new_obj = self._client.get_by_fields(name=temp_new, search='tags')
+        return self._client.get_by_etag(new_obj['etag'], search='tags')
+    async def color(self, label: str, color: str) -> dict:
+        obj = self._color_object(label, color)
+        url = self._client.BASE_URL + 'batch/tag'
+        payload = {'update': [obj]}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, [obj])[0]
+    async def sorting(self, label: str, sort: int) -> dict:
+        obj = self._sorting_object(label, sort)
+        url = self._client.BASE_URL + 'batch/tag'
+        payload = {'update': [obj]}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, [obj])[0]
+    async def nesting(self, child: str, parent: str) -> dict:
+        obj, pobj = self._nesting_objects(child, parent)
+        if pobj is None:
+            return obj
+        url = self._client.BASE_URL + 'batch/tag'
+        payload = {'update': [pobj, obj]}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, [pobj, obj])[1]
+    async def update(self, obj):
+        obj_list, batch = self._update_objects(obj)
+        url = self._client.BASE_URL + 'batch/tag'
+        payload = {'update': obj_list}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        items = self._batch_result(response, obj_list)
+        if not batch:
+            return items[0]
+        return items
+    async def _send_concurrently(self, method, url: str, pending: dict, max_concurrency: int = None) -> dict:
+        semaphore = asyncio.Semaphore(max_concurrency or self.MAX_CONCURRENCY)
+        async def send(kwargs):
+            async with semaphore:
+                return await method(url, cookies=self._client.cookies, headers=self.headers, **kwargs)
+        results = await asyncio.gather(*(send(kwargs) for kwargs in pending.values()), return_exceptions=True)
+        return {name: result for name, result in zip(pending, results) if isinstance(result, Exception)}
+    async def merge(self, label, merged: str):
+        kept_obj, merge_queue = self._merge_queue(label, merged)
+        url = self._client.BASE_URL + 'tag/merge'
+        failed = await self._send_concurrently(self._client.http_put, url, self._merge_requests(merge_queue, kept_obj))
+        await self._client.sync()
+        self._raise_failures(failed, 'Merge')
+        return kept_obj
+    async def bulk_merge(self, labels, merged: str, max_concurrency: int = None) -> dict:
+        url, pending, failed = self._bulk_merge_requests(labels, merged)
+        failed.update(await self._send_concurrently(self._client.http_put, url, pending, max_concurrency))
+        await self._client.sync()
+        return self._bulk_result(pending, failed)
+    async def delete(self, label):
+        url, pending = self._delete_requests(label)
+        failed = await self._send_concurrently(self._client.http_delete, url, pending)
+        objects = self._after_delete(pending, failed)
+        await self._client.sync()
+        return self._deleted_result(objects, failed)
+    async def bulk_delete(self, labels, max_concurrency: int = None) -> dict:
+        url, pending, failed = self._bulk_delete_requests(labels)
+        failed.update(await self._send_concurrently(self._client.http_delete, url, pending, max_concurrency))
+        result = self._after_bulk_delete(pending, failed)
+        await self._client.sync()
+        return result
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up TickTickMod from a config entry."""
 
+class AsyncProjectManager(ProjectManager):
+    async def create(self, name, color: str = 'random', project_type: str = 'TASK', folder_id: str = None):
+        obj = self._create_objects(name, color=color, project_type=project_type, folder_id=folder_id)
+        url = self._client.BASE_URL + 'batch/project'
+        payload = {'add': obj}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, obj, 'projects')
+    async def update(self, obj):
+        tasks = self._update_objects(obj)
+        url = self._client.BASE_URL + 'batch/project'
+        payload = {'update': tasks}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, tasks, 'projects')
+    async def delete(self, ids):
+        ids = self._existing_ids(ids, 'projects', "Project '{}' Does Not Exist To Delete")
+        url = self._client.BASE_URL + 'batch/project'
+        payload = {'delete': ids}
+        await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        return self._delete_local(ids)
+    async def archive(self, ids):
+        return await self.update(self._archive_objects(ids))
+    async def create_folder(self, name):
+        objs = self._folder_objects(name)
+        url = self._client.BASE_URL + 'batch/projectGroup'
+        payload = {'add': objs}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, objs, 'project_folders')
+    async def update_folder(self, obj):
+        tasks = self._update_objects(obj)
+        url = self._client.BASE_URL + 'batch/projectGroup'
+        payload = {'update': tasks}
+        response = await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        if self._client.sync_required(response):
+            await self._client.sync()
+        return self._batch_result(response, tasks, 'project_folders')
+    async def delete_folder(self, ids):
+        ids = self._existing_ids(ids, 'project_folders', "Project Folder '{}' Does Not Exist To Delete")
+        url = self._client.BASE_URL + 'batch/projectGroup'
+        payload = {'delete': ids}
+        await self._client.http_post(url, json=payload, cookies=self._client.cookies, headers=self.headers)
+        deleted = self._deleted_folders(ids)
+        await self._client.sync()
+        return deleted
+
+
+class AsyncTickTickClient(TickTickClient):
+    """TickTick client performing all requests on a shared aiohttp session.
+
+    The managers mirror the ones of TickTickClient, but every method that talks
+    to the server is a coroutine. Nothing is requested until prepare_session()
+    or sync() is awaited.
+    """
+    DEFAULT_TIMEOUT = aiohttp.ClientTimeout(connect=DEFAULT_TIMEOUT[0], sock_read=DEFAULT_TIMEOUT[1])
+    PROJECT_MANAGER = AsyncProjectManager
+    TAGS_MANAGER = AsyncTagsManager
+    TASK_MANAGER = AsyncTaskManager
+    def __init__(self, oauth: OAuth2, session: aiohttp.ClientSession, incremental_sync: bool = False, sync_on_write: bool = True,
+                 timeout: aiohttp.ClientTimeout = None, stream_sync: bool = False, task_fields=None) -> None:
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self._init_state(oauth, session, incremental_sync, sync_on_write, stream_sync, task_fields)
+        self._init_managers()
+    async def prepare_session(self, username: str = None, password: str = None, sync: bool = True) -> None:
+        # Loads the settings (time zone, profile id) the managers rely on, then syncs unless told not to
+        if username is not None:
+            await self._login(username, password)
+        await self._settings()
+        if sync:
+            await self.sync()
+    async def _login(self, username: str, password: str) -> None:
+        url = self.BASE_URL + 'user/signon'
+        user_info = {'username': username, 'password': password}
+        parameters = {'wc': True, 'remember': True}
+        response = await self.http_post(url, json=user_info, params=parameters, headers=self.HEADERS)
+        self.access_token = response['token']
+        self.cookies['t'] = self.access_token
+    async def _settings(self):
+        url = self.BASE_URL + 'user/preferences/settings'
+        parameters = {'includeWeb': True}
+        response = await self.http_get(url, params=parameters, cookies=self.cookies, headers=self.HEADERS)
+        self.time_zone = response['timeZone']
+        self.profile_id = response['id']
+        return response
+    async def _fetch_sync(self, url: str):
+        if not self.stream_sync:
+            with self.metrics.timed('http'):
+                text = await self._send('GET', url, cookies=self.cookies, headers=self.HEADERS)
+            with self.metrics.timed('decode'):
+                return filter_task_fields(self._decode(text), self.task_fields)
+        with self.metrics.request('GET', url) as record:
+            with self.metrics.timed('http'):
+                response = await self._session.get(url, cookies=self.cookies, headers=self.HEADERS, timeout=self.timeout)
+            async with response:
+                record.received()
+                self.check_status_code(response, 'Could Not Complete Request')
+                with self.metrics.timed('decode'):
+                    payload = await async_decode_sync_payload(response.content, self.task_fields, self._streamed_tasks(url))
+                record.size = response.content.total_bytes
+        return payload
+    async def sync(self, full: bool = False):
+        url = self._sync_url(full)
+        with self.metrics.sync():
+            try:
+                response = await self._fetch_sync(url)
+            except RateLimitError:
+                raise
+            except RuntimeError:
+                if url == self.INITIAL_BATCH_URL:
+                    raise
+                # The server rejected the checkpoint, start over from a full snapshot
+                url = self.INITIAL_BATCH_URL
+                response = await self._fetch_sync(url)
+            with self.metrics.timed('state'):
+                self._apply_sync(url, response)
+        return response
+    @staticmethod
+    def check_status_code(response, error_message: str) -> None:
+        if response.status == 429:
+            raise RateLimitError(error_message, parse_retry_after(response.headers.get('Retry-After')))
+        if response.status != 200:
+            raise RuntimeError(error_message)
+    @staticmethod
+    def _query_parameters(params):
+        # aiohttp only accepts str, int and float query values
+        if not params:
+            return params
+        return {key: str(value).lower() if isinstance(value, bool) else value for key, value in params.items()}
+    async def _send(self, method: str, url: str, params=None, **kwargs) -> str:
+        # Sends a request and returns its body, recording it in self.metrics
+        kwargs.setdefault('timeout', self.timeout)
+        with self.metrics.request(method, url) as record:
+            async with self._session.request(method, url, params=self._query_parameters(params), **kwargs) as response:
+                self.check_status_code(response, 'Could Not Complete Request')
+                text = await response.text()
+                record.received(response.content.total_bytes)
+        return text
+    @staticmethod
+    def _decode(text: str):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+    async def _request(self, method: str, url: str, **kwargs):
+        return self._decode(await self._send(method, url, **kwargs))
+    async def http_post(self, url, **kwargs):
+        return await self._request('POST', url, **kwargs)
+    async def http_get(self, url, **kwargs):
+        return await self._request('GET', url, **kwargs)
+    async def http_delete(self, url, **kwargs):
+        return await self._request('DELETE', url, **kwargs)
+    async def http_put(self, url, **kwargs):
+        return await self._request('PUT', url, **kwargs)
+
+def _scan_interval_bounds(entry: ConfigEntry) -> tuple:
+    return (entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+            entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL))
+
+def _account_interval_bounds(hass: HomeAssistant, entry_ids) -> tuple:
+    # A shared coordinator polls as often as its most demanding entry asks, taking the lowest
+    # floor and the lowest ceiling. The floor stays below the ceiling since each entry's does
+    bounds = [_scan_interval_bounds(entry) for entry_id in entry_ids
+              if (entry := hass.config_entries.async_get_entry(entry_id)) is not None]
+    return (min((low for low, _ in bounds), default=DEFAULT_MIN_SCAN_INTERVAL),
+            min((high for _, high in bounds), default=DEFAULT_MAX_SCAN_INTERVAL))
+
+def _apply_interval_bounds(hass: HomeAssistant, account: dict) -> None:
+    coordinator = account['coordinator']
+    min_interval, max_interval = _account_interval_bounds(hass, account['entries'])
+    if (coordinator.min_interval.total_seconds(), coordinator.max_interval.total_seconds()) != (min_interval, max_interval):
+        coordinator.set_interval_bounds(min_interval, max_interval)
+
+def _account_key(profile_id: str) -> str:
+    # Entries of the same TickTick account share one client, coordinator and snapshot
+    return hashlib.sha256(profile_id.encode()).hexdigest()[:16]
+
+def _snapshot_store(hass: HomeAssistant, account_key: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{account_key}")
+
+def _entry_snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    # Where snapshots were stored before they were shared by the entries of an account
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}")
+
+async def _async_migrate_entry_snapshot(hass: HomeAssistant, entry: ConfigEntry, account_key: str) -> None:
+    entry_store = _entry_snapshot_store(hass, entry)
+    if (snapshot := await entry_store.async_load()) is None:
+        return
+    store = _snapshot_store(hass, account_key)
+    if await store.async_load() is None:
+        await store.async_save(snapshot)
+    await entry_store.async_remove()
+
+def _create_ticktick_client(hass: HomeAssistant, client_id, client_secret, access_token) -> AsyncTickTickClient:
+    # Passing the aiohttp session keeps OAuth2 from building a requests session the client never uses
+    session = async_get_clientsession(hass)
+    auth_client = OAuth2(client_id=client_id, client_secret=client_secret, redirect_uri="http://127.0.0.1:8080",
+                         access_token=access_token, session=session)
+    return AsyncTickTickClient(auth_client, session, incremental_sync=True, sync_on_write=False,
+                               stream_sync=True, task_fields=SYNC_TASK_FIELDS)
+
+def _create_entry_client(hass: HomeAssistant, entry: ConfigEntry) -> AsyncTickTickClient:
     client_id = entry.data[CONF_CLIENT_ID]
     client_secret = entry.data[CONF_CLIENT_SECRET]
     # email = entry.data[CONF_EMAIL]
     # password = entry.data[CONF_PASSWORD]
     access_token = entry.data.get(CONF_ACCESS_TOKEN)
+    return _create_ticktick_client(hass, client_id, client_secret, access_token)
 
-    # Initialize your TickTick client
+async def _async_identify_account(hass: HomeAssistant, entry: ConfigEntry, ticktick_client: AsyncTickTickClient) -> str:
+    # Only needed the first time, the key is stored in the entry so later setups work offline
     try:
-        ticktick_client = await hass.async_add_executor_job(
-            # _create_ticktick_client, email, password, client_id, client_secret, access_token
-            _create_ticktick_client, client_id, client_secret, access_token
+        await ticktick_client.prepare_session(sync=False)
+    except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError) as e:
+        raise ConfigEntryNotReady(f"Could not load the TickTick settings: {e}") from e
+    account_key = _account_key(ticktick_client.profile_id)
+    # Entries set up before accounts were shared have their own snapshot, it becomes the account's
+    await _async_migrate_entry_snapshot(hass, entry, account_key)
+    # Remembered for unloading and removal, which happen without a client
+    hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_ACCOUNT_KEY: account_key})
+    return account_key
+
+async def _async_create_coordinator(hass: HomeAssistant, entry: ConfigEntry, ticktick_client: AsyncTickTickClient,
+                                    account_key: str) -> TickTickDataUpdateCoordinator:
+    coordinator = TickTickDataUpdateCoordinator(hass, ticktick_client, _snapshot_store(hass, account_key), *_scan_interval_bounds(entry))
+    if await coordinator.async_load_snapshot():
+        # Entities are created from the snapshot while the settings and tasks are
+        # fetched in the background, so they are available even if TickTick is not
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh {entry.entry_id}"
         )
-        
-        _LOGGER.debug("Authentication successful")
-        _LOGGER.debug(client_id)
-        _LOGGER.debug(client_secret)
-        # _LOGGER.debug(email)
-        # _LOGGER.debug(password)
-        _LOGGER.debug(access_token)
-        
-        # Log the projects
-        # projects = ticktick_client.state["projects"]
-        tasks = ticktick_client.task.get_from_project('5dad62dff0fe1fc4fbea252b')
-        _LOGGER.debug("TickTick Tasks: %s", tasks)
+    else:
+        await coordinator.async_config_entry_first_refresh()
+    return coordinator
 
-    except Exception as e:
-        _LOGGER.exception("Error setting up TickTickMod: %s", e)
-        return False
-    try:
-        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = ticktick_client
-        # coordinator = TickTickDataUpdateCoordinator(hass, ticktick_client)
-        # await coordinator._async_update_data()
+async def _async_acquire_coordinator(hass: HomeAssistant, entry: ConfigEntry) -> TickTickDataUpdateCoordinator:
+    """Return the account's shared coordinator, creating it for the first entry."""
+    accounts = hass.data.setdefault(ACCOUNTS, {})
+    ticktick_client = _create_entry_client(hass, entry)
+    if (account_key := entry.data.get(CONF_ACCOUNT_KEY)) is None:
+        account_key = await _async_identify_account(hass, entry, ticktick_client)
+    async with hass.data.setdefault(ACCOUNTS_LOCK, asyncio.Lock()):
+        if account_key not in accounts:
+            accounts[account_key] = {
+                'coordinator': await _async_create_coordinator(hass, entry, ticktick_client, account_key),
+                'entries': set()
+            }
+        account = accounts[account_key]
+        account['entries'].add(entry.entry_id)
+        _apply_interval_bounds(hass, account)
+    return account['coordinator']
 
-        # entry.runtime_data = coordinator
+async def _async_release_coordinator(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the entry's reference, shutting the coordinator down with the last one."""
+    accounts = hass.data.get(ACCOUNTS, {})
+    account_key = entry.data.get(CONF_ACCOUNT_KEY)
+    account = accounts.get(account_key)
+    if account is None:
+        return
+    account['entries'].discard(entry.entry_id)
+    coordinator = account['coordinator']
+    if account['entries']:
+        if coordinator.config_entry is entry:
+            # Keep polling on behalf of an entry that is still loaded
+            coordinator.config_entry = hass.config_entries.async_get_entry(next(iter(account['entries'])))
+        _apply_interval_bounds(hass, account)
+        return
+    accounts.pop(account_key)
+    await coordinator.async_shutdown()
 
-        # await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up TickTickMod from a config entry."""
+
+    # Initialize your TickTick client
+    try:
+        coordinator = await _async_acquire_coordinator(hass, entry)
+        _LOGGER.debug("Authentication successful")
+    except ConfigEntryNotReady:
+        raise
     except Exception as e:
-        _LOGGER.debug(e)
+        _LOGGER.exception("Error setting up TickTickMod: %s", e)
+        return False
 
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply new polling bounds without reloading the entry."""
+    if (account := hass.data.get(ACCOUNTS, {}).get(entry.data.get(CONF_ACCOUNT_KEY))) is not None:
+        _apply_interval_bounds(hass, account)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    hass.data[DOMAIN].pop(entry.entry_id)
-    return True
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_coordinator(hass, entry)
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the state snapshot once no entry of the account is left."""
+    await _entry_snapshot_store(hass, entry).async_remove()  # Left over if the entry was never migrated
+    account_key = entry.data.get(CONF_ACCOUNT_KEY)
+    if account_key is None:
+        return  # The entry was never set up, so it has no snapshot
+    if any(other.entry_id != entry.entry_id and other.data.get(CONF_ACCOUNT_KEY) == account_key
+           for other in hass.config_entries.async_entries(DOMAIN)):
+        return
+    await _snapshot_store(hass, account_key).async_remove()
@@ -0,0 +1,139 @@
+"""Calendar platform for the TickTick integration."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import TickTickDataUpdateCoordinator
+from .entity import TickTickProjectEntity
+from .state import IntervalIndex
+
+# Length of the event shown for a timed task without a later due date
+TIMED_TASK_DURATION = timedelta(minutes=30)
+
+
+def _task_time_zone(task: dict[str, Any]) -> tzinfo:
+    """Return the time zone a task's all-day dates are relative to."""
+    if (name := task.get("timeZone")) and (time_zone := dt_util.get_time_zone(name)):
+        return time_zone
+    return dt_util.DEFAULT_TIME_ZONE
+
+
+def _convert_api_event(
+    task: dict[str, Any],
+) -> tuple[datetime, datetime, CalendarEvent] | None:
+    """Convert a TickTick API task into an indexable CalendarEvent.
+
+    Returns the event with the aware datetimes it spans, or ``None`` for
+    tasks without dates. All-day tasks become date events, their due date
+    being exclusive as in ``TaskManager.dates``.
+    """
+    if (start_str := task.get("startDate") or task.get("dueDate")) is None:
+        return None
+    start = datetime.fromisoformat(start_str)
+    due_str = task.get("dueDate")
+    end = datetime.fromisoformat(due_str) if due_str else start
+    if task.get("allDay") or task.get("isAllDay"):
+        time_zone = _task_time_zone(task)
+        start_day: date = start.astimezone(time_zone).date()
+        end_day: date = max(
+            end.astimezone(time_zone).date(), start_day + timedelta(days=1)
+        )
+        event = CalendarEvent(
+            start=start_day,
+            end=end_day,
+            summary=task["title"],
+            description=task.get("content"),
+            uid=task["id"],
+        )
+        return (
+            dt_util.start_of_local_day(start_day),
+            dt_util.start_of_local_day(end_day),
+            event,
+        )
+    if end <= start:
+        end = start + TIMED_TASK_DURATION
+    event = CalendarEvent(
+        start=start,
+        end=end,
+        summary=task["title"],
+        description=task.get("content"),
+        uid=task["id"],
+    )
+    return start, end, event
+
+
+def _build_event_index(tasks: list[dict[str, Any]]) -> IntervalIndex:
+    """Index the events of the given tasks by the time they span."""
+    return IntervalIndex(
+        entry
+        for entry in (_convert_api_event(task) for task in tasks)
+        if entry is not None
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the TickTick calendar platform."""
+    coordinator: TickTickDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        TickTickCalendarEntity(
+            coordinator,
+            project,
+            entry.entry_id,
+        )
+        for project in coordinator.data["projects"]
+    )
+
+
+class TickTickCalendarEntity(TickTickProjectEntity, CalendarEntity):
+    """A calendar of the dated tasks of a TickTick project.
+
+    Events are converted and indexed once per change of the project, the
+    calendar card's repeated window requests are answered from the index.
+    """
+
+    def __init__(
+        self,
+        coordinator: TickTickDataUpdateCoordinator,
+        project: dict,
+        config_entry_id: str,
+    ) -> None:
+        """Initialize TickTickCalendarEntity."""
+        super().__init__(coordinator, project, config_entry_id)
+        self._index: IntervalIndex | None = None
+
+    def _event_index(self) -> IntervalIndex:
+        """Return the event index of this project, building it if needed."""
+        if self._index is None:
+            self._index = _build_event_index(self._project_tasks())
+        return self._index
+
+    def _invalidate(self) -> None:
+        """Index the events again when they are next read."""
+        self._index = None
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next upcoming event."""
+        if self.coordinator.data is None:
+            return None
+        return self._event_index().first_ending_after(dt_util.now())
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return the events overlapping the given window."""
+        if self.coordinator.data is None:
+            return []
+        return self._event_index().overlapping(start_date, end_date)
@@ -6,11 +6,28 @@ from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, ConfigFlowResult, OptionsFlow
+from homeassistant.core import callback
 # from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.helpers.selector import TextSelector, TextSelectorConfig, TextSelectorType
+from homeassistant.helpers.selector import (
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
+)
 
-from .const import DOMAIN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_ACCESS_TOKEN
+from .const import (
+    DOMAIN,
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_ACCESS_TOKEN,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,11 +51,37 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+SCAN_INTERVAL_SELECTOR = NumberSelector(
+    NumberSelectorConfig(min=10, max=86400, step=1, mode=NumberSelectorMode.BOX, unit_of_measurement="s"),
+)
+
+
+def _options_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the options schema, defaulting to the current options."""
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_MIN_SCAN_INTERVAL,
+                default=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+            ): SCAN_INTERVAL_SELECTOR,
+            vol.Required(
+                CONF_MAX_SCAN_INTERVAL,
+                default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+            ): SCAN_INTERVAL_SELECTOR,
+        }
+    )
+
 class TickTickModConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for TickTickMod."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return TickTickModOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -52,9 +95,8 @@ class TickTickModConfigFlow(ConfigFlow, domain=DOMAIN):
                     access_token = json.loads(user_input[CONF_ACCESS_TOKEN])
                     _LOGGER.debug("Access token JSON parsed successfully: %s", access_token)
 
-                # For now, simply return a successful result without performing any authentication
-                await self.async_set_unique_id("ticktick_mod")
-                self._abort_if_unique_id_configured()
+                # For now, simply return a successful result without performing any authentication.
+                # Several entries may use the same account, they share its client once set up
                 # return self.async_create_entry(
                 #     title = user_input[CONF_EMAIL], data=user_input
                 # )
@@ -73,3 +115,33 @@ class TickTickModConfigFlow(ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors
         )
+
+
+class TickTickModOptionsFlow(OptionsFlow):
+    """Handle the polling options of TickTickMod."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize the options flow.
+
+        Home Assistant only sets ``config_entry`` on options flows from
+        2024.11, so the entry is kept here for older releases.
+        """
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the polling interval bounds."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            user_input = {key: int(value) for key, value in user_input.items()}
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_scan_interval"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=_options_schema(user_input or self._config_entry.options),
+            errors=errors
+        )
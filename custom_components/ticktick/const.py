@@ -2,3 +2,36 @@ DOMAIN = "ticktick_mod"
 CONF_CLIENT_ID = "client_id"
 CONF_CLIENT_SECRET = "client_secret"
 CONF_ACCESS_TOKEN = "access_token"
+# Hash of the TickTick profile id, entries with the same key share a client
+CONF_ACCOUNT_KEY = "account_key"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+
+# Polling interval bounds in seconds, the coordinator adapts between them
+DEFAULT_MIN_SCAN_INTERVAL = 30
+DEFAULT_MAX_SCAN_INTERVAL = 900
+
+STORAGE_KEY = f"{DOMAIN}.snapshot"
+STORAGE_VERSION = 1
+
+# Task fields kept from sync responses, everything else is dropped while decoding
+SYNC_TASK_FIELDS = (
+    "id",
+    "projectId",
+    "parentId",
+    "etag",
+    "title",
+    "content",
+    "desc",
+    "status",
+    "priority",
+    "tags",
+    "dueDate",
+    "startDate",
+    "allDay",
+    "isAllDay",
+    "timeZone",
+    "sortOrder",
+    "kind",
+    "modifiedTime",
+)
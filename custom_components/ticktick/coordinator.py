@@ -7,35 +7,187 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN
+from .const import DEFAULT_MAX_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL, DOMAIN
+from .exceptions import RateLimitError
 
 _LOGGER = logging.getLogger(__name__)
 
+# Edits made within this window are collapsed into a single sync
+REQUEST_REFRESH_COOLDOWN = 5
+# Seconds to wait before writing the state snapshot after a refresh
+SNAPSHOT_SAVE_DELAY = 30
+# Factor the polling interval grows by after each poll without changes
+IDLE_BACKOFF_FACTOR = 2
+
+
+def _project_signature(tasks: list[dict]) -> frozenset:
+    """Return a value that changes whenever one of the given tasks changes."""
+    return frozenset((task["id"], task.get("etag")) for task in tasks)
+
 
 class TickTickDataUpdateCoordinator(DataUpdateCoordinator[dict]):
-    """A TickTick Data Update Coordinator."""
+    """A TickTick Data Update Coordinator.
+
+    The polling interval adapts between a floor and a ceiling: it drops to
+    the floor after local edits and remote changes, grows while the account
+    is idle and follows the server's Retry-After when rate limited.
+    """
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, ticktick_client) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ticktick_client,
+        store: Store | None = None,
+        min_interval: float = DEFAULT_MIN_SCAN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_SCAN_INTERVAL,
+    ) -> None:
         """Initialize the TickTick data coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=1),
+            update_interval=timedelta(seconds=min_interval),
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REQUEST_REFRESH_COOLDOWN, immediate=False
+            ),
+            # Listeners are not called when a refresh returns the same data
+            always_update=False,
         )
         self.ticktick_client = ticktick_client
+        self._store = store
+        # Projects whose tasks changed in the last update, entities of other projects skip it
+        self.changed_projects: set[str] = set()
+        self._signatures: dict[str, frozenset] = {}
+        self._projects_signature: tuple = ()
+        self._written_projects: set[str] = set()
+        self.min_interval = timedelta(seconds=min_interval)
+        self.max_interval = timedelta(seconds=max_interval)
+        # A client started from a snapshot has not asked the server for its settings yet
+        self._settings_loaded = bool(ticktick_client.profile_id)
+
+    def set_interval_bounds(self, min_interval: float, max_interval: float) -> None:
+        """Change the polling floor and ceiling, e.g. after an options update."""
+        self.min_interval = timedelta(seconds=min_interval)
+        self.max_interval = timedelta(seconds=max_interval)
+        self.update_interval = self.min_interval
+
+    def _back_off(self) -> None:
+        """Poll less often, up to the ceiling."""
+        self.update_interval = min(
+            self.update_interval * IDLE_BACKOFF_FACTOR, self.max_interval
+        )
+
+    def _build_data(self) -> dict:
+        """Build the coordinator data from the client's local state.
+
+        The current data is returned as is when no project changed, so an
+        unchanged poll does not notify any entity.
+        """
+        state = self.ticktick_client.state
+        projects = state["projects"].to_list()
+        # Tasks grouped by projectId so each entity only reads its own project
+        tasks = state["tasks"].group_by("projectId")
+        signatures = {
+            project_id: _project_signature(project_tasks)
+            for project_id, project_tasks in tasks.items()
+        }
+        self.changed_projects = {
+            project_id
+            for project_id in signatures.keys() | self._signatures.keys()
+            if signatures.get(project_id) != self._signatures.get(project_id)
+        } | self._written_projects
+        self._written_projects = set()
+        self._signatures = signatures
+        projects_signature = tuple(
+            (project["id"], project.get("etag")) for project in projects
+        )
+        if (
+            self.data is not None
+            and not self.changed_projects
+            and projects_signature == self._projects_signature
+        ):
+            return self.data
+        self._projects_signature = projects_signature
+        return {"projects": projects, "tasks": tasks}
+
+    async def _async_load_settings(self) -> None:
+        """Load the account settings, which a snapshot only has a copy of."""
+        client = self.ticktick_client
+        profile_id = client.profile_id
+        await client.prepare_session(sync=False)
+        if profile_id and client.profile_id != profile_id:
+            # The snapshot belongs to another account, start over from a full sync
+            client.reset_local_state()
+        self._settings_loaded = True
 
     async def _async_update_data(self) -> dict:
+        self.changed_projects = set()
         try:
-            await self.hass.async_add_executor_job(self.ticktick_client.sync)
-            data = {
-                "projects": self.ticktick_client.state["projects"],
-                "tasks": self.ticktick_client.task.get_from_project("5dad62dff0fe1fc4fbea252b"),
-            }
-            return data
+            if not self._settings_loaded:
+                await self._async_load_settings()
+            await self.ticktick_client.sync()
+            # Local processing after the sync, reported next to the sync phases
+            with self.ticktick_client.metrics.timed("build"):
+                data = self._build_data()
+        except RateLimitError as e:
+            self._back_off()
+            if e.retry_after is not None:
+                # The server's delay wins over the ceiling
+                self.update_interval = max(
+                    self.update_interval, timedelta(seconds=e.retry_after)
+                )
+            raise UpdateFailed(
+                f"Rate limited by TickTick, retrying in {self.update_interval}"
+            ) from e
         except Exception as e:
+            self._back_off()
             raise UpdateFailed(f"Error updating data from TickTick: {e}") from e
+        if data is self.data:
+            self._back_off()
+            return data
+        # Changes tend to come in bursts, so poll quickly again
+        self.update_interval = self.min_interval
+        if self._store is not None:
+            self._store.async_delay_save(
+                self.ticktick_client.dump_snapshot, SNAPSHOT_SAVE_DELAY
+            )
+        return data
+
+    async def async_load_snapshot(self) -> bool:
+        """Publish the last saved state snapshot, if there is one.
+
+        Returns whether a snapshot was loaded. The client keeps the snapshot's
+        sync checkpoint, so the next refresh only downloads what changed, and
+        its time zone and profile id until that refresh loads the settings.
+        """
+        if self._store is None or (snapshot := await self._store.async_load()) is None:
+            return False
+        try:
+            self.ticktick_client.load_snapshot(snapshot)
+        except ValueError:
+            _LOGGER.warning("Ignoring invalid TickTick state snapshot")
+            return False
+        self.async_set_updated_data(self._build_data())
+        return True
+
+    async def async_handle_local_write(self, project_id: str | None = None) -> None:
+        """Publish writes already applied to the local state and schedule a sync.
+
+        The written project is always reported as changed, even when the
+        server did not return new etags for its tasks. Without a project id
+        every project is. The sync is debounced, so a burst of edits results
+        in a single request.
+        """
+        if project_id is None:
+            self._written_projects.update(self._signatures)
+        else:
+            self._written_projects.add(project_id)
+        self.update_interval = self.min_interval
+        self.async_set_updated_data(self._build_data())
+        await self.async_request_refresh()
@@ -0,0 +1,50 @@
+"""Diagnostics support for the TickTick integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCESS_TOKEN, CONF_CLIENT_ID, CONF_CLIENT_SECRET, DOMAIN
+from .coordinator import TickTickDataUpdateCoordinator
+from .state import IndexedCollection
+
+TO_REDACT = {CONF_ACCESS_TOKEN, CONF_CLIENT_ID, CONF_CLIENT_SECRET}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Besides the redacted entry, this reports the client's request and sync
+    metrics, which tell TickTick's latency apart from local processing.
+    """
+    coordinator: TickTickDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    client = coordinator.ticktick_client
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "min_interval": coordinator.min_interval.total_seconds(),
+            "max_interval": coordinator.max_interval.total_seconds(),
+        },
+        "client": {
+            "incremental_sync": client.incremental_sync,
+            "stream_sync": client.stream_sync,
+            "checkpoint": client.checkpoint,
+            "state_sizes": {
+                name: len(items)
+                for name, items in client.state.items()
+                if isinstance(items, IndexedCollection)
+            },
+        },
+        "metrics": client.metrics.as_dict(),
+    }
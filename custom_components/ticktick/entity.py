@@ -0,0 +1,53 @@
+"""Base entity for the TickTick integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import TickTickDataUpdateCoordinator
+
+
+class TickTickProjectEntity(CoordinatorEntity[TickTickDataUpdateCoordinator]):
+    """An entity presenting the tasks of a single TickTick project.
+
+    State is only written when the project's tasks or the coordinator's
+    availability changed. Subclasses drop whatever they derived from the
+    tasks in ``_invalidate``.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: TickTickDataUpdateCoordinator,
+        project: dict,
+        config_entry_id: str,
+    ) -> None:
+        """Initialize TickTickProjectEntity."""
+        super().__init__(coordinator)
+        self._attr_name = project["name"].capitalize()
+        self._attr_unique_id = f"{config_entry_id}-{project['id']}"
+        self._project_id = project["id"]
+        self._was_available = coordinator.last_update_success
+
+    def _project_tasks(self) -> list[dict[str, Any]]:
+        """Return the API tasks of this project from the coordinator data."""
+        return self.coordinator.data["tasks"].get(self._project_id, [])
+
+    def _invalidate(self) -> None:
+        """Drop what was derived from the project's tasks."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this project's tasks or availability changed."""
+        if (
+            self._project_id not in self.coordinator.changed_projects
+            and self.available == self._was_available
+        ):
+            return
+        self._was_available = self.available
+        self._invalidate()
+        super()._handle_coordinator_update()
@@ -0,0 +1,16 @@
+"""Exceptions raised by the TickTick client."""
+
+from __future__ import annotations
+
+
+class RateLimitError(RuntimeError):
+    """The server answered 429 Too Many Requests.
+
+    ``retry_after`` is the delay in seconds the server asked for, or ``None``
+    when it did not send a Retry-After header.
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.retry_after = retry_after
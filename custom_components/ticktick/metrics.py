@@ -0,0 +1,275 @@
+"""Request, retry and sync metrics of the TickTick client."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import re
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from urllib3.util.retry import Retry
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Object ids and checkpoints in paths, so every request to an endpoint shares its metrics
+_PATH_ID = re.compile(r"/(?:[0-9a-fA-F]{24}|inbox\d+|\d+)(?=/|$)")
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Return the metrics key of a request, e.g. ``GET /api/v2/batch/check/{id}``."""
+    return f"{method.upper()} {_PATH_ID.sub('/{id}', urlsplit(url).path)}"
+
+
+class TimingStats:
+    """Count, total, extremes and histogram of durations in seconds."""
+
+    __slots__ = ("count", "total", "last", "max", "buckets")
+
+    def __init__(self) -> None:
+        """Initialize empty stats."""
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, seconds: float) -> None:
+        """Record a duration."""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats as plain data."""
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "last": self.last,
+            "max": self.max,
+            "histogram": dict(zip(bounds, self.buckets)),
+        }
+
+
+class EndpointStats:
+    """Metrics of the requests sent to a single endpoint."""
+
+    __slots__ = ("calls", "failures", "retries", "response_bytes", "latency")
+
+    def __init__(self) -> None:
+        """Initialize empty stats."""
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.response_bytes = 0
+        self.latency = TimingStats()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats as plain data."""
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "response_bytes": self.response_bytes,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class RequestRecord:
+    """A request being timed by ``ClientMetrics.request``."""
+
+    __slots__ = ("start", "latency", "size")
+
+    def __init__(self) -> None:
+        """Start timing the request."""
+        self.start = time.perf_counter()
+        self.latency: float | None = None
+        self.size = 0
+
+    def received(self, size: int = 0) -> None:
+        """Mark the response as received, ``size`` being its body length."""
+        self.latency = time.perf_counter() - self.start
+        self.size = size
+
+
+class CountingReader:
+    """A binary file-like wrapper counting the bytes read through it."""
+
+    def __init__(self, stream) -> None:
+        """Wrap ``stream``."""
+        self._stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read from the wrapped stream."""
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class MetricsRetry(Retry):
+    """A urllib3 Retry reporting every retry it allows to ``on_retry``.
+
+    urllib3 retries silently inside the connection pool, this is the only
+    place a retry can be observed. The callback gets the method and URL.
+    """
+
+    def __init__(
+        self, *args: Any, on_retry: Callable[[str, str], None] | None = None, **kwargs: Any
+    ) -> None:
+        """Initialize the retry configuration."""
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+
+    def new(self, **kwargs: Any) -> MetricsRetry:
+        """Return a copy with updated counters, keeping the callback."""
+        retry = super().new(**kwargs)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, method=None, url=None, *args: Any, **kwargs: Any) -> MetricsRetry:
+        """Count an attempt, reporting it when another one is allowed."""
+        retry = super().increment(method, url, *args, **kwargs)
+        if self.on_retry is not None:
+            self.on_retry(method or "", url or "")
+        return retry
+
+
+class ClientMetrics:
+    """Per-endpoint request metrics and sync phase timings of a client.
+
+    Requests record their latency until the response body was received
+    (until the headers for streamed syncs), the body size after
+    decompression and whether they failed. Syncs record the time spent in
+    each phase: ``http``, ``decode`` and ``state``; a streamed sync reads
+    the body while decoding it, so its download counts as ``decode``.
+    Recording is thread safe, the synchronous client sends batches from a
+    thread pool.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self._sync_phases: dict[str, float] | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.endpoints: dict[str, EndpointStats] = {}
+            self.phases: dict[str, TimingStats] = {}
+            self.syncs = TimingStats()
+            self.sync_failures = 0
+            self.last_sync: dict[str, float] = {}
+
+    def _endpoint(self, method: str, url: str) -> EndpointStats:
+        name = endpoint_name(method, url)
+        if (stats := self.endpoints.get(name)) is None:
+            stats = self.endpoints[name] = EndpointStats()
+        return stats
+
+    @contextmanager
+    def request(self, method: str, url: str) -> Iterator[RequestRecord]:
+        """Time a request, counting it as failed when the block raises."""
+        record = RequestRecord()
+        failed = False
+        try:
+            yield record
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            latency = record.latency
+            if latency is None:
+                latency = time.perf_counter() - record.start
+            with self._lock:
+                stats = self._endpoint(method, url)
+                stats.calls += 1
+                stats.failures += failed
+                stats.response_bytes += record.size
+                stats.latency.add(latency)
+
+    def record_retry(self, method: str, url: str) -> None:
+        """Count a retry of a request."""
+        with self._lock:
+            self._endpoint(method, url).retries += 1
+
+    def attach(self, session) -> None:
+        """Count the retries of a requests session built by requests_retry_session."""
+        for adapter in session.adapters.values():
+            if isinstance(retry := getattr(adapter, "max_retries", None), MetricsRetry):
+                retry.on_retry = self.record_retry
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        """Time a block as ``phase``, adding it to the running sync if any."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                if (stats := self.phases.get(phase)) is None:
+                    stats = self.phases[phase] = TimingStats()
+                stats.add(seconds)
+                if self._sync_phases is not None:
+                    self._sync_phases[phase] = self._sync_phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def sync(self) -> Iterator[None]:
+        """Time a sync, collecting the phases timed within it."""
+        phases: dict[str, float] = {}
+        self._sync_phases = phases
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                self.sync_failures += 1
+            raise
+        else:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.syncs.add(seconds)
+                self.last_sync = {**phases, "total": seconds}
+        finally:
+            self._sync_phases = None
+
+    def totals(self) -> dict[str, Any]:
+        """Return the request counters summed over every endpoint."""
+        with self._lock:
+            stats = list(self.endpoints.values())
+        calls = sum(endpoint.calls for endpoint in stats)
+        latency = sum(endpoint.latency.total for endpoint in stats)
+        return {
+            "calls": calls,
+            "failures": sum(endpoint.failures for endpoint in stats),
+            "retries": sum(endpoint.retries for endpoint in stats),
+            "response_bytes": sum(endpoint.response_bytes for endpoint in stats),
+            "mean_latency": latency / calls if calls else None,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric as plain data, e.g. for diagnostics."""
+        totals = self.totals()
+        with self._lock:
+            return {
+                "totals": totals,
+                "endpoints": {
+                    name: stats.as_dict() for name, stats in sorted(self.endpoints.items())
+                },
+                "syncs": {
+                    **self.syncs.as_dict(),
+                    "failures": self.sync_failures,
+                    "last_phases": dict(self.last_sync),
+                },
+                "phases": {name: stats.as_dict() for name, stats in self.phases.items()},
+            }
@@ -0,0 +1,130 @@
+"""Sensor platform exposing the TickTick client's request and sync metrics."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import TickTickDataUpdateCoordinator
+from .metrics import ClientMetrics
+
+# The metrics are read from memory, polling them costs nothing
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True, kw_only=True)
+class TickTickSensorEntityDescription(SensorEntityDescription):
+    """Describes a TickTick metrics sensor."""
+
+    value_fn: Callable[[ClientMetrics], Any]
+
+
+def _mean_latency_ms(metrics: ClientMetrics) -> float | None:
+    """Return the mean request latency in milliseconds."""
+    if (latency := metrics.totals()["mean_latency"]) is None:
+        return None
+    return round(latency * 1000, 1)
+
+
+SENSORS: tuple[TickTickSensorEntityDescription, ...] = (
+    TickTickSensorEntityDescription(
+        key="last_sync_duration",
+        translation_key="last_sync_duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        value_fn=lambda metrics: metrics.syncs.last,
+    ),
+    TickTickSensorEntityDescription(
+        key="mean_request_latency",
+        translation_key="mean_request_latency",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=_mean_latency_ms,
+    ),
+    TickTickSensorEntityDescription(
+        key="requests",
+        translation_key="requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.totals()["calls"],
+    ),
+    TickTickSensorEntityDescription(
+        key="failed_requests",
+        translation_key="failed_requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.totals()["failures"],
+    ),
+    TickTickSensorEntityDescription(
+        key="retries",
+        translation_key="retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.totals()["retries"],
+    ),
+    TickTickSensorEntityDescription(
+        key="response_bytes",
+        translation_key="response_bytes",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        value_fn=lambda metrics: metrics.totals()["response_bytes"],
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the TickTick metrics sensors."""
+    coordinator: TickTickDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        TickTickMetricsSensor(coordinator, description, entry.entry_id)
+        for description in SENSORS
+    )
+
+
+class TickTickMetricsSensor(SensorEntity):
+    """A metric of the requests sent to TickTick.
+
+    The sensors are diagnostic and disabled by default. They poll the
+    client's in-memory metrics instead of following the coordinator, which
+    does not notify its listeners when a sync changed nothing.
+    """
+
+    entity_description: TickTickSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: TickTickDataUpdateCoordinator,
+        description: TickTickSensorEntityDescription,
+        config_entry_id: str,
+    ) -> None:
+        """Initialize TickTickMetricsSensor."""
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry_id}-{description.key}"
+        self._metrics = coordinator.ticktick_client.metrics
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current value of the metric."""
+        return self.entity_description.value_fn(self._metrics)
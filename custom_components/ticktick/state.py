@@ -0,0 +1,485 @@
+"""Indexed local state store for the TickTick client."""
+
+from __future__ import annotations
+
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+from typing import Any
+
+_MISSING = object()
+
+# Task fields stored as attributes, everything else is kept as compact JSON
+TASK_EAGER_FIELDS = (
+    "id",
+    "projectId",
+    "parentId",
+    "etag",
+    "title",
+    "content",
+    "status",
+    "dueDate",
+    "startDate",
+    "allDay",
+    "priority",
+    "tags",
+)
+_EAGER = frozenset(TASK_EAGER_FIELDS)
+_INTERNED = frozenset(("projectId", "parentId"))
+
+
+def _encode(fields: dict) -> str | None:
+    return json.dumps(fields, separators=(",", ":")) if fields else None
+
+
+def _sorted_position(values: list, keys: list, value: Any, key: Any) -> int:
+    # Sorted index entries are ordered by value, then key, so each has exactly one position
+    low = bisect_left(values, value)
+    return bisect_left(keys, key, low, bisect_right(values, value, low))
+
+
+class TaskRecord(MutableMapping):
+    """A compact task, usable wherever the raw API dict was.
+
+    The fields the integration reads live in slots, with project ids and tag
+    names interned. Every other field is kept as a single compact JSON string
+    and decoded when it is read, so nested values of those fields have to be
+    assigned back to be changed.
+    """
+
+    __slots__ = (*TASK_EAGER_FIELDS, "_extra")
+
+    def __init__(self, fields: Mapping[str, Any] = ()) -> None:
+        """Initialize the record from an API task."""
+        self._extra = None
+        self.update(fields)
+
+    def _set(self, key: str, value: Any) -> None:
+        if key in _INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        elif key == "tags" and isinstance(value, list):
+            value = [sys.intern(tag) if isinstance(tag, str) else tag for tag in value]
+        object.__setattr__(self, key, value)
+
+    def _lazy(self) -> dict:
+        return json.loads(self._extra) if self._extra is not None else {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _EAGER:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._lazy()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of ``key``, or ``default`` when it is not set."""
+        if key in _EAGER:
+            return getattr(self, key, default)
+        return self._lazy().get(key, default)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _EAGER:
+            self._set(key, value)
+        else:
+            self.update({key: value})
+
+    def __delitem__(self, key: str) -> None:
+        if key in _EAGER:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        lazy = self._lazy()
+        del lazy[key]
+        self._extra = _encode(lazy)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _EAGER:
+            return hasattr(self, key)
+        return key in self._lazy()
+
+    def __iter__(self) -> Iterator[str]:
+        yield from (field for field in TASK_EAGER_FIELDS if hasattr(self, field))
+        yield from self._lazy()
+
+    def __len__(self) -> int:
+        return sum(hasattr(self, field) for field in TASK_EAGER_FIELDS) + len(self._lazy())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def update(self, other: Mapping[str, Any] = (), **fields: Any) -> None:
+        """Set several fields, encoding the lazy ones once."""
+        if isinstance(other, TaskRecord):
+            other = other.to_dict()  # Decodes the lazy fields once, not once per key
+        elif not isinstance(other, Mapping):
+            other = dict(other)
+        lazy = None
+        for key, value in (*other.items(), *fields.items()):
+            if key in _EAGER:
+                self._set(key, value)
+            else:
+                if lazy is None:
+                    lazy = self._lazy()
+                lazy[key] = value
+        if lazy is not None:
+            self._extra = _encode(lazy)
+
+    def to_dict(self) -> dict:
+        """Return the task as a plain dict, e.g. to send it to the API."""
+        return {
+            **{
+                field: getattr(self, field)
+                for field in TASK_EAGER_FIELDS
+                if hasattr(self, field)
+            },
+            **self._lazy(),
+        }
+
+
+def as_dict(obj: Any) -> Any:
+    """Return ``obj`` as a plain dict when it is a compact record."""
+    return obj.to_dict() if isinstance(obj, TaskRecord) else obj
+
+
+class IndexedCollection:
+    """An ordered collection of API objects with hashed indexes.
+
+    Objects are keyed by ``key`` (``id`` for most collections, ``name`` for
+    tags) and additionally indexed by ``etag``, by every field listed in
+    ``indexes`` and by every element of the list fields in ``multi_indexes``.
+    Sorted indexes for range queries and ordering are built on first use and
+    then kept up to date by every change. Iterating the collection yields
+    the stored objects in insertion order, so it can be used wherever the
+    client used plain lists. When a ``record`` type is given, plain dicts are
+    converted to it on insert.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[dict] = (),
+        key: str = "id",
+        indexes: Iterable[str] = (),
+        record: type | None = None,
+        multi_indexes: Iterable[str] = (),
+    ) -> None:
+        """Initialize the collection and index the given items."""
+        self.key = key
+        self.record = record
+        self.indexed_fields = tuple(indexes)
+        self.multi_indexed_fields = tuple(multi_indexes)
+        self._items: dict[Any, dict] = {}
+        self._etags: dict[str, Any] = {}
+        self._indexes: dict[str, dict[Any, dict[Any, dict]]] = {}
+        # Values an object was indexed under, so stale entries can be removed
+        # even after the object was mutated in place
+        self._indexed_values: dict[Any, tuple] = {}
+        # Field -> sorted values, their keys and the value each key was indexed under
+        self._sorted: dict[str, tuple[list, list, dict]] = {}
+        self.replace(items)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._items
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(key={self.key!r}, size={len(self)})"
+
+    def to_list(self) -> list[dict]:
+        """Return the stored objects as a list."""
+        return list(self._items.values())
+
+    def empty_copy(self) -> IndexedCollection:
+        """Return an empty collection keyed and indexed like this one."""
+        return type(self)(
+            key=self.key,
+            indexes=self.indexed_fields,
+            record=self.record,
+            multi_indexes=self.multi_indexed_fields,
+        )
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the object stored under ``key``."""
+        return self._items.get(key, default)
+
+    def get_by_etag(self, etag: str, default: Any = None) -> Any:
+        """Return the object with the given etag."""
+        key = self._etags.get(etag, _MISSING)
+        if key is _MISSING:
+            return default
+        return self._items.get(key, default)
+
+    def find(self, **fields: Any) -> list[dict]:
+        """Return every object whose fields equal the given values."""
+        if not fields:
+            raise ValueError("Must Include Field(s) To Be Searched For")
+        candidates: Iterable[dict]
+        if self.key in fields:
+            found = self._items.get(fields[self.key])
+            candidates = [found] if found is not None else []
+        elif "etag" in fields:
+            found = self.get_by_etag(fields["etag"])
+            candidates = [found] if found is not None else []
+        else:
+            indexed = next((field for field in fields if field in self.indexed_fields), None)
+            if indexed is not None:
+                candidates = list(self._indexes[indexed].get(fields[indexed], {}).values())
+            else:
+                candidates = self._items.values()
+        return [
+            obj
+            for obj in candidates
+            if all(obj.get(field, _MISSING) == value for field, value in fields.items())
+        ]
+
+    def group_by(self, field: str) -> dict[Any, list[dict]]:
+        """Return the stored objects grouped by the value of ``field``."""
+        if field in self._indexes:
+            return {
+                value: list(bucket.values())
+                for value, bucket in self._indexes[field].items()
+            }
+        groups: dict[Any, list[dict]] = {}
+        for obj in self._items.values():
+            groups.setdefault(obj.get(field), []).append(obj)
+        return groups
+
+    def select(
+        self,
+        where: dict[str, Any] | None = None,
+        any_of: dict[str, Iterable] | None = None,
+        between: dict[str, tuple[Any, Any]] | None = None,
+        order_by: str | None = None,
+        reverse: bool = False,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Return the objects matching every condition, optionally ordered.
+
+        ``where`` maps fields to the value they must equal, ``any_of`` maps
+        fields to values of which at least one must match (for multi indexed
+        fields, one of the list's elements) and ``between`` maps fields to
+        inclusive ``(low, high)`` bounds, either of which may be ``None``.
+        Objects without a value for ``order_by`` come last. Without
+        ``order_by`` the order is that of the most selective index.
+        """
+        conditions = [
+            self._membership(field, (value,)) for field, value in (where or {}).items()
+        ]
+        conditions += [
+            self._membership(field, values) for field, values in (any_of or {}).items()
+        ]
+        conditions += [
+            self._range(field, low, high) for field, (low, high) in (between or {}).items()
+        ]
+        if conditions:
+            # Start from the most selective condition and check the others per object
+            conditions.sort(key=lambda condition: condition[0])
+            _, driving, _ = conditions[0]
+            checks = [check for _, _, check in conditions[1:]]
+            keys = [
+                key
+                for key in driving()
+                if all(check(self._items[key]) for check in checks)
+            ]
+        else:
+            keys = list(self._items)
+        if order_by is not None:
+            keys = self._ordered(keys, order_by, reverse)
+        if limit is not None:
+            keys = keys[:limit]
+        return [self._items[key] for key in keys]
+
+    def _membership(self, field: str, values: Iterable) -> tuple:
+        values = set(values)
+        if field in self.multi_indexed_fields:
+            def check(obj: dict) -> bool:
+                return not values.isdisjoint(obj.get(field) or ())
+        else:
+            def check(obj: dict) -> bool:
+                return obj.get(field, _MISSING) in values
+        if field == self.key:
+            return len(values), lambda: [key for key in values if key in self._items], check
+        if field not in self._indexes:
+            return (
+                len(self._items),
+                lambda: [key for key, obj in self._items.items() if check(obj)],
+                check,
+            )
+        buckets = [self._indexes[field].get(value, {}) for value in values]
+        size = sum(len(bucket) for bucket in buckets)
+        return size, lambda: list({key: None for bucket in buckets for key in bucket}), check
+
+    def _range(self, field: str, low: Any, high: Any) -> tuple:
+        values, keys = self._sorted_index(field)
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+
+        def check(obj: dict) -> bool:
+            value = obj.get(field)
+            return (
+                value is not None
+                and (low is None or value >= low)
+                and (high is None or value <= high)
+            )
+
+        return end - start, lambda: keys[start:end], check
+
+    def _sorted_index(self, field: str) -> tuple[list, list]:
+        if field not in self._sorted:
+            of_key = {
+                key: value
+                for key, obj in self._items.items()
+                if (value := obj.get(field)) is not None
+            }
+            pairs = sorted((value, key) for key, value in of_key.items())
+            self._sorted[field] = (
+                [value for value, _ in pairs],
+                [key for _, key in pairs],
+                of_key,
+            )
+        values, keys, _ = self._sorted[field]
+        return values, keys
+
+    def _ordered(self, keys: list, field: str, reverse: bool) -> list:
+        if len(keys) * 8 < len(self._items):
+            # Few matches, sorting them is cheaper than walking the index
+            with_value = [key for key in keys if self._items[key].get(field) is not None]
+            with_value.sort(key=lambda key: self._items[key].get(field), reverse=reverse)
+        else:
+            _, index_keys = self._sorted_index(field)
+            selected = set(keys)
+            with_value = [
+                key
+                for key in (reversed(index_keys) if reverse else index_keys)
+                if key in selected
+            ]
+        missing = [key for key in keys if self._items[key].get(field) is None]
+        return with_value + missing
+
+    def upsert(self, obj: dict) -> dict:
+        """Insert ``obj`` or replace the object stored under the same key."""
+        if self.record is not None and not isinstance(obj, self.record):
+            obj = self.record(obj)
+        key = obj[self.key]
+        if key in self._items:
+            self._unindex(key)
+        self._items[key] = obj
+        self._index(key, obj)
+        return obj
+
+    def remove(self, key: Any) -> dict | None:
+        """Remove and return the object stored under ``key``."""
+        if key not in self._items:
+            return None
+        self._unindex(key)
+        return self._items.pop(key)
+
+    def replace(self, items: Iterable[dict]) -> None:
+        """Replace the whole collection and rebuild every index."""
+        self._items = {}
+        self._etags = {}
+        self._indexes = {
+            field: {} for field in (*self.indexed_fields, *self.multi_indexed_fields)
+        }
+        self._indexed_values = {}
+        self._sorted = {}
+        for obj in items:
+            self.upsert(obj)
+
+    def _index(self, key: Any, obj: dict) -> None:
+        for field, (values, keys, of_key) in self._sorted.items():
+            value = obj.get(field)
+            if value is not None:
+                position = _sorted_position(values, keys, value, key)
+                values.insert(position, value)
+                keys.insert(position, key)
+                of_key[key] = value
+        etag = obj.get("etag")
+        if etag is not None:
+            self._etags[etag] = key
+        values = []
+        for field in self.indexed_fields:
+            value = obj.get(field)
+            values.append(value)
+            if value is not None:
+                self._indexes[field].setdefault(value, {})[key] = obj
+        for field in self.multi_indexed_fields:
+            elements = tuple(obj.get(field) or ())
+            values.append(elements)
+            for value in elements:
+                self._indexes[field].setdefault(value, {})[key] = obj
+        self._indexed_values[key] = (etag, *values)
+
+    def _unindex(self, key: Any) -> None:
+        # The object may have been changed in place, so the indexed values are looked up
+        for field, (sorted_values, keys, of_key) in self._sorted.items():
+            value = of_key.pop(key, None)
+            if value is not None:
+                position = _sorted_position(sorted_values, keys, value, key)
+                del sorted_values[position]
+                del keys[position]
+        etag, *values = self._indexed_values.pop(key)
+        if etag is not None and self._etags.get(etag) == key:
+            del self._etags[etag]
+        fields = (*self.indexed_fields, *self.multi_indexed_fields)
+        for position, (field, value) in enumerate(zip(fields, values)):
+            elements = value if position >= len(self.indexed_fields) else (value,)
+            for element in elements:
+                if element is None:
+                    continue
+                bucket = self._indexes[field].get(element)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del self._indexes[field][element]
+
+
+class IntervalIndex:
+    """Intervals sorted by start, for overlap queries.
+
+    Each entry is a ``(start, end, value)`` tuple. An interval overlapping a
+    window must start within the longest interval's length before the
+    window, so a query only bisects the starts and checks the ends of that
+    slice. Empty intervals count as overlapping a window they start in.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[Any, Any, Any]] = ()) -> None:
+        """Initialize the index."""
+        self._entries = sorted(intervals, key=lambda entry: entry[0])
+        self._starts = [entry[0] for entry in self._entries]
+        self._longest = max(
+            (end - start for start, end, _ in self._entries), default=None
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def overlapping(self, start: Any, end: Any) -> list:
+        """Return the values of the intervals overlapping ``[start, end)``."""
+        if self._longest is None:
+            return []
+        low = bisect_left(self._starts, start - self._longest)
+        high = bisect_left(self._starts, end)
+        return [
+            value
+            for entry_start, entry_end, value in self._entries[low:high]
+            if entry_end > start or entry_start >= start
+        ]
+
+    def first_ending_after(self, moment: Any) -> Any:
+        """Return the earliest starting value whose interval ends after ``moment``."""
+        if self._longest is None:
+            return None
+        low = bisect_left(self._starts, moment - self._longest)
+        for entry_start, entry_end, value in self._entries[low:]:
+            if entry_end > moment or entry_start >= moment:
+                return value
+        return None
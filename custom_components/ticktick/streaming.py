@@ -0,0 +1,113 @@
+"""Incremental decoding of the batch/check sync payload."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # Streaming is optional, the whole body is decoded at once without it
+    ijson = None
+
+if TYPE_CHECKING:
+    from .state import IndexedCollection
+
+TASKS_PREFIX = "syncTaskBean.update.item"
+
+
+def streaming_available() -> bool:
+    """Return whether the streaming decoder can be used."""
+    return ijson is not None
+
+
+class SyncPayloadDecoder:
+    """Build a batch/check response from ijson parser events.
+
+    Task fields not listed in ``task_fields`` are dropped while the payload
+    is parsed, so they are never materialized. ``None`` keeps every field.
+    When ``tasks`` is given, each task is upserted into it as soon as its
+    object is complete and the collection takes the place of the
+    ``syncTaskBean.update`` list, so the tasks are never held twice.
+    """
+
+    def __init__(
+        self,
+        task_fields: Iterable[str] | None = None,
+        tasks: IndexedCollection | None = None,
+    ) -> None:
+        """Initialize the decoder."""
+        self.task_fields = frozenset(task_fields) if task_fields is not None else None
+        self.tasks = tasks
+        self._builder = ObjectBuilder()
+        self._task: ObjectBuilder | None = None
+
+    @property
+    def value(self) -> dict:
+        """Return the decoded payload."""
+        payload = self._builder.value
+        if self.tasks is not None and isinstance(payload.get("syncTaskBean"), dict):
+            payload["syncTaskBean"]["update"] = self.tasks
+        return payload
+
+    def _keep(self, prefix: str, event: str, value: Any) -> bool:
+        if self.task_fields is None or not prefix.startswith(TASKS_PREFIX):
+            return True
+        if prefix == TASKS_PREFIX:
+            return event != "map_key" or value in self.task_fields
+        return prefix[len(TASKS_PREFIX) + 1 :].split(".", 1)[0] in self.task_fields
+
+    def feed(self, prefix: str, event: str, value: Any) -> None:
+        """Add a single parser event to the payload."""
+        if not self._keep(prefix, event, value):
+            return
+        if self.tasks is None or not prefix.startswith(TASKS_PREFIX):
+            self._builder.event(event, value)
+            return
+        if self._task is None:
+            if event != "start_map":  # Not a task object, e.g. a null item
+                return
+            self._task = ObjectBuilder()
+        self._task.event(event, value)
+        if prefix == TASKS_PREFIX and event == "end_map":
+            self.tasks.upsert(self._task.value)
+            self._task = None
+
+
+def decode_sync_payload(
+    stream,
+    task_fields: Iterable[str] | None = None,
+    tasks: IndexedCollection | None = None,
+) -> dict:
+    """Decode a batch/check response from a binary file-like object."""
+    decoder = SyncPayloadDecoder(task_fields, tasks)
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        decoder.feed(prefix, event, value)
+    return decoder.value
+
+
+async def async_decode_sync_payload(
+    stream,
+    task_fields: Iterable[str] | None = None,
+    tasks: IndexedCollection | None = None,
+) -> dict:
+    """Decode a batch/check response from an asynchronous stream."""
+    decoder = SyncPayloadDecoder(task_fields, tasks)
+    async for prefix, event, value in ijson.parse_async(stream, use_float=True):
+        decoder.feed(prefix, event, value)
+    return decoder.value
+
+
+def filter_task_fields(response: Any, task_fields: Iterable[str] | None) -> Any:
+    """Drop unwanted task fields from an already decoded batch/check response."""
+    if task_fields is None or not isinstance(response, dict):
+        return response
+    task_bean = response.get("syncTaskBean") or {}
+    if task_bean.get("update"):
+        fields = frozenset(task_fields)
+        task_bean["update"] = [
+            {field: value for field, value in task.items() if field in fields}
+            for task in task_bean["update"]
+        ]
+    return response
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import Any, cast
 
 from homeassistant.components.todo import (
@@ -14,13 +14,11 @@ from homeassistant.components.todo import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
 from .coordinator import TickTickDataUpdateCoordinator
-
-SCAN_INTERVAL = timedelta(minutes=15)
+from .entity import TickTickProjectEntity
 
 TODO_STATUS_MAP = {
     "needsAction": TodoItemStatus.NEEDS_ACTION,
@@ -36,6 +34,8 @@ def _convert_todo_item(item: TodoItem) -> dict[str, Any]:
         "status": TODO_STATUS_MAP_INV.get(item.status, "needsAction"),
         "content": item.description,
     }
+    if item.uid is not None:
+        result["id"] = item.uid
     if (due := item.due) is not None:
         result["dueDate"] = dt_util.start_of_local_day(due).isoformat()
     return result
@@ -58,6 +58,31 @@ def _convert_api_item(item: dict[str, Any]) -> TodoItem:
     )
 
 
+def _convert_api_items(
+    tasks: list[dict[str, Any]], memo: dict[tuple[str, str], TodoItem]
+) -> tuple[list[TodoItem], dict[tuple[str, str], TodoItem]]:
+    """Convert TickTick API items, reusing the items of unchanged tasks.
+
+    ``memo`` maps ``(id, etag)`` to the TodoItem converted before. Tasks
+    without an etag are always converted, the client drops the etag of a
+    task it patched locally until the next sync. The returned memo only
+    holds the given tasks, so it is bounded by the project's size and
+    entries of deleted or changed tasks are evicted.
+    """
+    items: list[TodoItem] = []
+    new_memo: dict[tuple[str, str], TodoItem] = {}
+    for task in tasks:
+        if (etag := task.get("etag")) is None:
+            items.append(_convert_api_item(task))
+            continue
+        key = (task["id"], etag)
+        if (item := memo.get(key)) is None:
+            item = _convert_api_item(task)
+        new_memo[key] = item
+        items.append(item)
+    return items, new_memo
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
@@ -74,12 +99,9 @@ async def async_setup_entry(
     )
 
 
-class TickTickTodoListEntity(
-    CoordinatorEntity[TickTickDataUpdateCoordinator], TodoListEntity
-):
+class TickTickTodoListEntity(TickTickProjectEntity, TodoListEntity):
     """A To-do List representation of the TickTick project."""
 
-    _attr_has_entity_name = True
     _attr_supported_features = (
         TodoListEntityFeature.CREATE_TODO_ITEM
         | TodoListEntityFeature.UPDATE_TODO_ITEM
@@ -96,45 +118,45 @@ class TickTickTodoListEntity(
         config_entry_id: str,
     ) -> None:
         """Initialize TickTickTodoListEntity."""
-        super().__init__(coordinator)
-        self._attr_name = project["name"].capitalize()
-        self._attr_unique_id = f"{config_entry_id}-{project['id']}"
-        self._project_id = project["id"]
+        super().__init__(coordinator, project, config_entry_id)
+        self._todo_items: list[TodoItem] | None = None
+        self._item_memo: dict[tuple[str, str], TodoItem] = {}
+
+    def _invalidate(self) -> None:
+        """Convert the items again when they are next read."""
+        self._todo_items = None
 
     @property
     def todo_items(self) -> list[TodoItem] | None:
         """Get the current set of To-do items."""
         if self.coordinator.data is None:
             return None
-        return [
-            _convert_api_item(item)
-            for item in self.coordinator.data["tasks"]
-            if item["projectId"] == self._project_id
-        ]
+        if self._todo_items is None:
+            self._todo_items, self._item_memo = _convert_api_items(
+                self._project_tasks(), self._item_memo
+            )
+        return self._todo_items
 
     async def async_create_todo_item(self, item: TodoItem) -> None:
         """Add an item to the To-do list."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.ticktick_client.task.create,
-            _convert_todo_item(item),
+        await self.coordinator.ticktick_client.task.create(
+            {**_convert_todo_item(item), "projectId": self._project_id},
         )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_handle_local_write(self._project_id)
 
     async def async_update_todo_item(self, item: TodoItem) -> None:
         """Update a To-do item."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.ticktick_client.task.update,
-            _convert_todo_item(item),
+        await self.coordinator.ticktick_client.task.update(
+            {**_convert_todo_item(item), "projectId": self._project_id},
         )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_handle_local_write(self._project_id)
 
     async def async_delete_todo_items(self, uids: list[str]) -> None:
         """Delete To-do items."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.ticktick_client.task.delete,
-            [{"id": uid} for uid in uids],
+        await self.coordinator.ticktick_client.task.delete(
+            [{"id": uid, "projectId": self._project_id} for uid in uids],
         )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_handle_local_write(self._project_id)
 
     async def async_move_todo_item(
         self, uid: str, previous_uid: str | None = None